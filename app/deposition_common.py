@@ -0,0 +1,49 @@
+"""
+Shared helpers for the Deposition page
+Cached S3 report fetches
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict
+
+import requests
+import streamlit as st
+
+from app.http_client import get_session
+
+
+# Shared keep-alive session; lives in an imported module so it survives reruns
+_SESSION = get_session()
+
+
+def get_backend_base() -> str:
+    """Get backend base URL from environment or query params."""
+    return (
+        st.query_params.get("api")
+        or os.getenv("BACKEND_BASE")
+        or "http://localhost:8000"
+    ).rstrip("/")
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_case_json(backend: str, case_id: str, resource: str) -> Dict[str, Any]:
+    """GET /s3/case/{case_id}/{resource}; non-2xx responses raise so they are not cached."""
+    response = _SESSION.get(f"{backend}/s3/case/{case_id}/{resource}", timeout=(3, 30))
+    response.raise_for_status()
+    return response.json() or {}
+
+
+def _get_case_json(case_id: str, resource: str, what: str) -> Dict[str, Any]:
+    try:
+        return fetch_case_json(get_backend_base(), case_id, resource)
+    except requests.exceptions.HTTPError as e:
+        status = e.response.status_code if e.response is not None else "unknown"
+        return {"error": f"Failed to fetch {what}: {status}"}
+    except Exception as e:
+        return {"error": f"Error connecting to backend: {str(e)}"}
+
+
+def get_case_report(case_id: str) -> Dict[str, Any]:
+    """Fetch the deposition report HTML for a case from S3"""
+    return _get_case_json(case_id, "report", "report")
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Transient statuses only; other 4xx are returned to the caller untouched
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _build_retry() -> Retry:
+    # 502-504 cover the backend host's cold-start gateway errors; urllib3
+    # only retries idempotent methods, so webhook POSTs are never replayed.
+    # Backoff is exponential (0.2s, 0.4s, ...) and honours Retry-After on 429.
+    kwargs = dict(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=_RETRY_STATUSES,
+        raise_on_status=False,
+    )
+    try:
+        # urllib3 2.x: spread concurrent sessions' retries apart
+        return Retry(backoff_jitter=0.2, **kwargs)
+    except TypeError:
+        return Retry(**kwargs)
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=_build_retry(),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+# Built once per process: Streamlit re-executes page scripts on every rerun,
+# but imported modules stay cached, so all pages and sessions share this pool.
+_SESSION = _build_session()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled HTTP session (keep-alive, retries on transient errors)."""
+    return _SESSION
+
+
+# Small shared pool for fire-and-forget calls (e.g. workflow webhooks) so a
+# slow upstream never blocks the script thread that renders the page.
+_EXECUTOR = ThreadPoolExecutor(max_workers=3, thread_name_prefix="http")
+
+
+# Per-host circuit breaker for background calls: after a run of failures the
+# host is skipped for a while instead of tying up the executor on timeouts.
+_BREAKER_THRESHOLD = 5
+_BREAKER_RECOVERY_SECONDS = 30
+_BREAKER_LOCK = threading.Lock()
+_BREAKER: dict[str, dict] = {}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a host whose recent background calls all failed."""
+
+
+def _circuit_allows(host: str) -> bool:
+    with _BREAKER_LOCK:
+        state = _BREAKER.get(host)
+        if not state or state["failures"] < _BREAKER_THRESHOLD:
+            return True
+        if time.monotonic() - state["opened_at"] < _BREAKER_RECOVERY_SECONDS:
+            return False
+        # Half-open: let this call through as the probe, hold the rest back
+        state["opened_at"] = time.monotonic()
+        return True
+
+
+def _record_outcome(host: str, future: Future) -> None:
+    try:
+        response = future.result()
+        failed = response.status_code >= 500
+    except requests.exceptions.ReadTimeout:
+        # The host accepted the call and is still working on it
+        failed = False
+    except Exception:
+        failed = True
+    with _BREAKER_LOCK:
+        if not failed:
+            _BREAKER.pop(host, None)
+            return
+        state = _BREAKER.setdefault(host, {"failures": 0, "opened_at": 0.0})
+        state["failures"] += 1
+        if state["failures"] >= _BREAKER_THRESHOLD:
+            state["opened_at"] = time.monotonic()
+
+
+def breaker_state() -> dict[str, dict]:
+    """Snapshot of hosts with recent background-call failures (for debug views)."""
+    with _BREAKER_LOCK:
+        return {
+            host: {
+                "failures": state["failures"],
+                "open": state["failures"] >= _BREAKER_THRESHOLD
+                and time.monotonic() - state["opened_at"] < _BREAKER_RECOVERY_SECONDS,
+            }
+            for host, state in _BREAKER.items()
+        }
+
+
+def _timed_request(method: str, url: str, **kwargs) -> requests.Response:
+    # Timed on the worker itself: a Future reports done() before its
+    # done-callbacks run, so a callback-side measurement can be read too early
+    t0 = time.perf_counter()
+    response = _SESSION.request(method, url, **kwargs)
+    response.elapsed_ms = (time.perf_counter() - t0) * 1000
+    return response
+
+
+def submit_request(method: str, url: str, **kwargs) -> Future:
+    """Issue ``method url`` on the pooled session in the background; returns a Future.
+
+    The response carries ``elapsed_ms``, the full call time including retries.
+    While the host's circuit is open the Future fails at once with CircuitOpenError.
+    """
+    host = urlsplit(url).netloc
+    if not _circuit_allows(host):
+        future: Future = Future()
+        future.set_exception(CircuitOpenError(f"{host} is unavailable; retrying in under {_BREAKER_RECOVERY_SECONDS}s"))
+        return future
+    future = _EXECUTOR.submit(_timed_request, method, url, **kwargs)
+    future.add_done_callback(lambda f: _record_outcome(host, f))
+    return future
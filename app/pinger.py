@@ -0,0 +1,113 @@
+"""
+Backend keep-alive pinger
+Runs one background thread per process that periodically hits /health
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from app.http_client import get_session
+
+
+# Process-wide state: page scripts are re-executed on every rerun, but this
+# module is imported once, so all sessions share a single pinger thread.
+_PINGER_LOCK = threading.Lock()
+_PINGER_EVENT = threading.Event()
+# Stop signal of the running pinger; each thread gets its own, so a stop
+# racing a restart can neither be missed nor hit the replacement thread
+_PINGER_STOP: Optional[threading.Event] = None
+_PINGER_STARTED_AT: Optional[datetime] = None
+
+
+def ping_backend(backend_url: str) -> bool:
+    """Ping the backend to keep it alive."""
+    try:
+        # HEAD: liveness only, no body to transfer or parse
+        response = get_session().head(f"{backend_url}/health", timeout=(2, 3), allow_redirects=False)
+        return response.status_code < 500
+    except Exception:
+        return False
+
+
+def _pinger_loop(backend_url: str, stop: threading.Event) -> None:
+    ping_count = 0
+    consecutive_failures = 0
+    max_failures = 5
+
+    while True:
+        # 5-7 minutes with cheap jitter; the wait returns True as soon as
+        # stop_pinger() is called, so shutdown never waits out a sleep
+        interval = 300 + (hash(time.time()) & 0x7f)
+        if stop.wait(interval):
+            break
+        try:
+            success = ping_backend(backend_url)
+            ping_count += 1
+
+            if success:
+                consecutive_failures = 0
+                print(f"✅ Backend ping #{ping_count} successful at {datetime.now()}")
+            else:
+                consecutive_failures += 1
+                print(f"❌ Backend ping #{ping_count} failed at {datetime.now()} (failure #{consecutive_failures})")
+
+                # If too many consecutive failures, back off before the next attempt
+                if consecutive_failures >= max_failures:
+                    print(f"⚠️ {consecutive_failures} consecutive failures. Increasing retry interval.")
+                    if stop.wait(300):
+                        break
+                    consecutive_failures = 0
+        except Exception as e:
+            consecutive_failures += 1
+            print(f"❌ Pinger error #{consecutive_failures}: {e}")
+            if stop.wait(60):
+                break
+
+            # Prevent infinite error loops
+            if consecutive_failures >= max_failures:
+                print(f"⚠️ Too many errors ({consecutive_failures}). Pausing pinger for 10 minutes.")
+                if stop.wait(600):
+                    break
+                consecutive_failures = 0
+
+
+def start_backend_pinger(backend_url: str) -> Optional[threading.Thread]:
+    """
+    Start the process-wide pinger if it is not running yet
+
+    Returns:
+        The new thread, or None if a pinger was already started
+    """
+    global _PINGER_STOP, _PINGER_STARTED_AT
+    # Lock-free fast path for every rerun after the first
+    if _PINGER_EVENT.is_set():
+        return None
+    with _PINGER_LOCK:
+        if _PINGER_EVENT.is_set():
+            return None
+        stop = threading.Event()
+        thread = threading.Thread(target=_pinger_loop, args=(backend_url, stop), daemon=True, name="BackendPinger")
+        thread.start()
+        _PINGER_STOP = stop
+        _PINGER_EVENT.set()
+        _PINGER_STARTED_AT = datetime.now()
+        return thread
+
+
+def pinger_started_at() -> Optional[datetime]:
+    """Return when the process-wide pinger was started, or None if it is not running."""
+    return _PINGER_STARTED_AT
+
+
+def stop_pinger() -> None:
+    """Wake the pinger thread and make it exit; a later start_backend_pinger() starts a new one."""
+    global _PINGER_STOP, _PINGER_STARTED_AT
+    with _PINGER_LOCK:
+        if _PINGER_STOP is not None:
+            _PINGER_STOP.set()
+            _PINGER_STOP = None
+        _PINGER_EVENT.clear()
+        _PINGER_STARTED_AT = None
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import streamlit as st
-import streamlit.components.v1 as components
+from streamlit.errors import StreamlitAPIException
 
 
-def inject_base_styles() -> None:
-    theme = st.session_state.get("theme", "dark")
+@st.cache_resource(ttl=24 * 60 * 60, show_spinner=False)
+def _base_css_html(theme: str) -> str:
+    """Build the base <style> block for a theme once; every rerun reuses the string."""
     if theme == "light":
         bg = "#f8fafc"  # slate-50
         panel = "rgba(0,0,0,0.06)"
@@ -23,8 +24,7 @@ def inject_base_styles() -> None:
         text = "#e5e7eb"  # slate-200 on dark bg
         panel_bg = "rgba(255,255,255,0.04)"
 
-    st.markdown(
-        f"""
+    return f"""
         <style>
         :root {{
           --bg: {bg};
@@ -129,15 +129,24 @@ def inject_base_styles() -> None:
           box-shadow: 0 4px 12px rgba(0,0,0,0.15);
         }}
 
+        /* Case Report progress card */
+        .pg-card {{text-align: center; margin: 2rem 0;}}
+        .pg-case {{font-size: 1.1rem; color: #9ca3af; margin-bottom: 0.5rem;}}
+        .pg-note {{font-size: 0.9rem; color: #6b7280; margin-bottom: 0.5rem;}}
+
         .fade-in {{animation: fadeIn .6s ease-out both;}}
         .slide-up {{animation: slideUp .6s ease-out both;}}
 
         @keyframes fadeIn {{from {{opacity:0;}} to {{opacity:1;}}}}
         @keyframes slideUp {{from {{opacity:0; transform: translateY(18px);}} to {{opacity:1; transform: translateY(0);}} }}
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def inject_base_styles() -> None:
+    # Streamlit drops elements a rerun does not emit, so the block is still
+    # sent every run; only building it is cached.
+    st.markdown(_base_css_html(st.session_state.get("theme", "dark")), unsafe_allow_html=True)
 
 
 def theme_provider() -> None:
@@ -208,33 +217,14 @@ def top_nav(active: str = "Dashboard") -> None:
         with right:
             rcols = st.columns([1, 3, 2, 2, 2])
             
-            def _robust_switch(page_candidates: tuple[str, ...]) -> None:
-                """Try multiple page names; if all fail, soft-redirect to root so sidebar is available."""
+            def _robust_switch(page_path: str) -> None:
+                """Navigate in-session by file path; point at the sidebar if the page is not registered."""
+                # Catch only the API error: the rerun that switch_page raises to
+                # navigate derives from Exception on streamlit 1.37 and must escape
                 try:
-                    from streamlit_extras.switch_page_button import switch_page
-                    for target in page_candidates:
-                        try:
-                            switch_page(target)
-                            return
-                        except Exception:
-                            continue
-                except Exception:
-                    pass
-                # Fallback: client-side redirect to app root
-                components.html(
-                    """
-                    <script>
-                      try {
-                        if (window && window.parent) {
-                          window.parent.location.replace(window.parent.location.origin + window.parent.location.pathname);
-                        } else {
-                          window.location.replace('/');
-                        }
-                      } catch (e) {}
-                    </script>
-                    """,
-                    height=0,
-                )
+                    st.switch_page(page_path)
+                except StreamlitAPIException:
+                    st.warning("Could not navigate. Please use the sidebar.")
             # Theme toggle
             with rcols[0]:
                 current_theme = st.session_state.get("theme", "dark")
@@ -245,31 +235,15 @@ def top_nav(active: str = "Dashboard") -> None:
             # Case Report nav
             with rcols[1]:
                 if st.button("📝 Case Report", key="topnav_case", use_container_width=True, help="Open Case Report"):
-                    _robust_switch((
-                        "pages/01_Case_Report",
-                        "01_Case_Report",
-                        "Case Report",
-                        "Case_Report",
-                        "case report",
-                    ))
+                    _robust_switch("pages/01_Case_Report.py")
             # Results nav
             with rcols[2]:
                 if st.button("🧪 Results", key="topnav_results", use_container_width=True, help="Open Results"):
-                    _robust_switch((
-                        "pages/04_Results",
-                        "04_Results",
-                        "Results",
-                        "results",
-                    ))
+                    _robust_switch("pages/04_Results.py")
             # History nav
             with rcols[3]:
                 if st.button("📚 History", key="topnav_history", use_container_width=True, help="Open History"):
-                    _robust_switch((
-                        "pages/05_History",
-                        "05_History",
-                        "History",
-                        "history",
-                    ))
+                    _robust_switch("pages/05_History.py")
             # Logout
             with rcols[4]:
                 if st.button("Log out", use_container_width=True):
@@ -1,6 +1,9 @@
 from __future__ import annotations
 import os
 import json
+import asyncio
+import threading
+import time
 import sqlite3
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -56,6 +59,7 @@ except ImportError:
     from n8n_integration import report_generator, n8n_manager, get_last_execution_id, store_execution_id
 
 @app.get("/health")
+@app.head("/health")
 def health() -> Dict[str, Any]:
     return {"ok": True}
 
@@ -2198,6 +2202,22 @@ def api_s3_comparison(case_id: str, report_id: str, version: str) -> Dict[str, A
             raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
 
 
+# Live progress subscribers: case_id -> {(event loop, queue)} for open SSE streams
+_PROGRESS_SUBSCRIBERS: Dict[str, set] = {}
+_PROGRESS_SUBSCRIBERS_LOCK = threading.Lock()
+# Server-side watchdog: streams end after the generation timeout
+PROGRESS_STREAM_MAX_SECONDS = 7200
+PROGRESS_STREAM_HEARTBEAT_SECONDS = 30
+
+
+def _publish_progress(case_id: str, event: Dict[str, Any]) -> None:
+    """Hand a progress event to every open stream for the case (called from worker threads)."""
+    with _PROGRESS_SUBSCRIBERS_LOCK:
+        subscribers = list(_PROGRESS_SUBSCRIBERS.get(case_id, ()))
+    for loop, queue in subscribers:
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+
 @app.post("/webhook/progress")
 def webhook_progress(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Endpoint for n8n to POST progress updates during workflow execution.
@@ -2234,6 +2254,9 @@ def webhook_progress(payload: Dict[str, Any]) -> Dict[str, Any]:
         finally:
             conn.close()
         
+        # The workflow is writing this case; its page listing may have changed
+        _invalidate_case_documents(case_id)
+        _publish_progress(case_id, {"pct": progress, "step": step, "message": message})
         return {"ok": True, "case_id": case_id, "progress": progress}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -2258,6 +2281,7 @@ def webhook_finalize(payload: Dict[str, Any]) -> Dict[str, Any]:
         case_id = str(payload.get("case_id") or payload.get("patient_id") or "").strip()
         if not case_id:
             raise ValueError("case_id required")
+        _invalidate_case_documents(case_id)
         def _pick_url(obj: Any) -> str | None:
             if isinstance(obj, dict):
                 return obj.get("signed_url") or obj.get("url") or obj.get("href")
@@ -2348,14 +2372,24 @@ def list_runs(case_id: str) -> Dict[str, Any]:
         conn.close()
 
 @app.get("/progress/{case_id}/latest")
-def get_latest_progress(case_id: str) -> Dict[str, Any]:
-    """Get the latest progress update for a case."""
+def get_latest_progress(case_id: str, since: Optional[str] = None) -> Dict[str, Any]:
+    """Get the latest progress update for a case.
+
+    `since` ("YYYY-MM-DD HH:MM:SS", UTC) limits the lookup to the current run,
+    so a finished earlier run of the same case is not reported again.
+    """
     conn = get_conn()
     try:
-        row = conn.execute(
-            "SELECT * FROM progress_updates WHERE case_id=? ORDER BY created_at DESC LIMIT 1",
-            (case_id,),
-        ).fetchone()
+        if since:
+            row = conn.execute(
+                "SELECT * FROM progress_updates WHERE case_id=? AND created_at >= ? ORDER BY created_at DESC LIMIT 1",
+                (case_id, since),
+            ).fetchone()
+        else:
+            row = conn.execute(
+                "SELECT * FROM progress_updates WHERE case_id=? ORDER BY created_at DESC LIMIT 1",
+                (case_id,),
+            ).fetchone()
         if not row:
             return {"ok": True, "progress": None}
         return {
@@ -2372,6 +2406,52 @@ def get_latest_progress(case_id: str) -> Dict[str, Any]:
     finally:
         conn.close()
 
+@app.get("/progress/{case_id}/stream")
+async def stream_progress(case_id: str, request: Request, since: Optional[str] = None) -> StreamingResponse:
+    """Server-Sent Events stream of progress updates for a case.
+
+    Emits the latest stored update first (limited to the run started at
+    `since`, see get_latest_progress), then one `data:` event per
+    /webhook/progress call, with a comment heartbeat every 30s.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    subscriber = (loop, queue)
+    with _PROGRESS_SUBSCRIBERS_LOCK:
+        _PROGRESS_SUBSCRIBERS.setdefault(case_id, set()).add(subscriber)
+    latest = (await asyncio.to_thread(get_latest_progress, case_id, since)).get("progress")
+
+    async def events():
+        try:
+            if latest:
+                yield f"data: {json.dumps({'pct': latest['progress'], 'step': latest['step'], 'message': latest['message']})}\n\n"
+            deadline = loop.time() + PROGRESS_STREAM_MAX_SECONDS
+            while loop.time() < deadline:
+                if await request.is_disconnected():
+                    return
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=PROGRESS_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+                if event.get("pct", 0) >= 100:
+                    return
+            yield f"data: {json.dumps({'timeout': True})}\n\n"
+        finally:
+            with _PROGRESS_SUBSCRIBERS_LOCK:
+                subscribers = _PROGRESS_SUBSCRIBERS.get(case_id)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        _PROGRESS_SUBSCRIBERS.pop(case_id, None)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.get("/progress/{case_id}/all")
 def get_all_progress(case_id: str) -> Dict[str, Any]:
     """Get all progress updates for a case, newest first."""
@@ -2539,44 +2619,10 @@ def api_get_case_documents(case_id: str) -> Dict[str, Any]:
     Used by the Deposition page to display source images.
     """
     try:
-        client = s3_client()
-        prefix = f"{case_id}/Input/pages/"
-        documents = []
-        
-        # List all objects in the Input/pages folder
-        paginator = client.get_paginator("list_objects_v2")
-        for page in paginator.paginate(Bucket=S3_BUCKET, Prefix=prefix):
-            for obj in page.get("Contents", []):
-                key = obj["Key"]
-                filename = key.split("/")[-1]  # Get just the filename
-                
-                # Only include image files
-                if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.pdf')):
-                    # Generate presigned URL (valid for 7 days)
-                    try:
-                        presigned_url = client.generate_presigned_url(
-                            'get_object',
-                            Params={'Bucket': S3_BUCKET, 'Key': key},
-                            ExpiresIn=604800  # 7 days
-                        )
-                        
-                        documents.append({
-                            "filename": filename,
-                            "key": key,
-                            "url": presigned_url,
-                            "size": obj.get("Size", 0),
-                            "last_modified": obj.get("LastModified").isoformat() if obj.get("LastModified") else None
-                        })
-                    except Exception as e:
-                        print(f"Error generating presigned URL for {key}: {e}")
-                        continue
-        
-        # Sort by filename
-        documents.sort(key=lambda x: x["filename"])
-        
+        documents = _cached_case_documents(case_id)
         return {
             "case_id": case_id,
-            "documents": documents,
+            "documents": list(documents),
             "count": len(documents)
         }
     
@@ -2584,6 +2630,74 @@ def api_get_case_documents(case_id: str) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Error fetching documents: {str(e)}")
 
 
+# Source page listings: case_id -> (expires_at, documents). Kept briefly, since
+# pages are still being uploaded while a run is in progress; progress webhooks
+# drop the case's entry and empty listings are never stored.
+_CASE_DOCUMENTS_TTL_SECONDS = 60
+_CASE_DOCUMENTS_CACHE: Dict[str, tuple] = {}
+_CASE_DOCUMENTS_LOCK = threading.Lock()
+
+
+def _cached_case_documents(case_id: str) -> tuple:
+    """Presigned page listing for a case, reused for a short window (URLs live 7 days)."""
+    now = time.monotonic()
+    with _CASE_DOCUMENTS_LOCK:
+        entry = _CASE_DOCUMENTS_CACHE.get(case_id)
+    if entry and entry[0] > now:
+        return entry[1]
+    documents = _list_case_documents(case_id)
+    if documents:
+        with _CASE_DOCUMENTS_LOCK:
+            for key in [k for k, (expires_at, _) in _CASE_DOCUMENTS_CACHE.items() if expires_at <= now]:
+                del _CASE_DOCUMENTS_CACHE[key]
+            _CASE_DOCUMENTS_CACHE[case_id] = (now + _CASE_DOCUMENTS_TTL_SECONDS, documents)
+    return documents
+
+
+def _invalidate_case_documents(case_id: str) -> None:
+    with _CASE_DOCUMENTS_LOCK:
+        _CASE_DOCUMENTS_CACHE.pop(case_id, None)
+
+
+def _list_case_documents(case_id: str) -> tuple:
+    """List and presign {case_id}/Input/pages/*."""
+    client = s3_client()
+    prefix = f"{case_id}/Input/pages/"
+    documents = []
+    
+    # List all objects in the Input/pages folder (up to 1000 keys per request)
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=S3_BUCKET, Prefix=prefix, PaginationConfig={"PageSize": 1000}):
+        for obj in page.get("Contents", []):
+            key = obj["Key"]
+            filename = key.split("/")[-1]  # Get just the filename
+            
+            # Only include image files
+            if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.pdf')):
+                # Generate presigned URL (valid for 7 days); signing is local, no S3 round-trip
+                try:
+                    presigned_url = client.generate_presigned_url(
+                        'get_object',
+                        Params={'Bucket': S3_BUCKET, 'Key': key},
+                        ExpiresIn=604800  # 7 days
+                    )
+                    
+                    documents.append({
+                        "filename": filename,
+                        "key": key,
+                        "url": presigned_url,
+                        "size": obj.get("Size", 0),
+                        "last_modified": obj.get("LastModified").isoformat() if obj.get("LastModified") else None
+                    })
+                except Exception as e:
+                    print(f"Error generating presigned URL for {key}: {e}")
+                    continue
+    
+    # Sort by filename
+    documents.sort(key=lambda x: x["filename"])
+    return tuple(documents)
+
+
 @app.get("/s3/case/{case_id}/report")
 def api_get_case_report(case_id: str) -> Dict[str, Any]:
     """
@@ -256,7 +256,8 @@ class N8nWorkflowManager:
                 f"{self.n8n_base_url}/api/v1/executions?limit=25",
             ]
             import time
-            for _ in range(10):  # short poll window ~3-4s
+            attempts = 10
+            for attempt in range(attempts):  # short poll window ~3-4s
                 for url in urls:
                     try:
                         resp = self.session.get(url, timeout=5)
@@ -287,7 +288,9 @@ class N8nWorkflowManager:
                                 return {"success": True, "started": True, "execution_id": exec_id}
                     except Exception:
                         continue
-                time.sleep(0.3)
+                # No pause after the last poll: fall through to the result immediately
+                if attempt + 1 < attempts:
+                    time.sleep(0.3)
             # Could not capture exec id, but report start state
             return {"success": started, "started": started, "error": "could not capture execution id"}
         except Exception as e:
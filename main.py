@@ -1,13 +1,13 @@
 import streamlit as st
-from streamlit_extras.switch_page_button import switch_page
+from streamlit.errors import StreamlitAPIException
 import os
 from dotenv import load_dotenv
-import requests
 import time
 
 # Local modules
 from app.ui import inject_base_styles, show_header
 from app.auth import is_authenticated, show_login_page, get_current_user, logout
+from app.http_client import get_session
 
 # --- CONFIGURATION ---
 BACKEND_URL = "https://basic-streamlit-ui.onrender.com"  
@@ -44,7 +44,7 @@ if doc_id:
                 try:
                     # We use the endpoint that lists ALL input pages for a case
                     api_url = f"{BACKEND_URL}/s3/case/{case_id_input}/documents"
-                    response = requests.get(api_url, timeout=15)
+                    response = get_session().get(api_url, timeout=(3, 15))
                     
                     if response.status_code == 200:
                         data = response.json()
@@ -98,6 +98,15 @@ if doc_id:
 # =========================================================
 # 🏠 NORMAL MAIN APPLICATION
 # =========================================================
+def _go_to(page_path: str, label: str) -> None:
+    """Navigate in-session to a page by its file path; point at the sidebar if that fails."""
+    # Only the API error: on streamlit 1.37 the navigation rerun itself is an Exception
+    try:
+        st.switch_page(page_path)
+    except StreamlitAPIException:
+        st.info(f"Please use the sidebar to navigate to {label}.")
+
+
 def main() -> None:
     # Check authentication first
     if not is_authenticated():
@@ -146,68 +155,23 @@ def main() -> None:
     
     with col1:
         if st.button("📋 Case Report", type="primary", use_container_width=True):
-            try:
-                from streamlit_extras.switch_page_button import switch_page
-                for name in ["01_Case_Report", "Case Report", "01 Case Report", "Case_Report"]:
-                    try:
-                        switch_page(name)
-                        return
-                    except Exception:
-                        continue
-            except Exception:
-                st.info("Please use the sidebar to navigate to Case Report.")
+            _go_to("pages/01_Case_Report.py", "Case Report")
     
     with col2:
         if st.button("📄 Deposition", use_container_width=True):
-            try:
-                from streamlit_extras.switch_page_button import switch_page
-                for name in ["02_Deposition", "Deposition", "02 Deposition", "Deposition Page"]:
-                    try:
-                        switch_page(name)
-                        return
-                    except Exception:
-                        continue
-            except Exception:
-                st.info("Please use the sidebar to navigate to Deposition.")
+            _go_to("pages/02_Deposition.py", "Deposition")
     
     with col3:
         if st.button("📊 Results", use_container_width=True):
-            try:
-                from streamlit_extras.switch_page_button import switch_page
-                for name in ["04_Results", "Results", "04 Results", "Results Page"]:
-                    try:
-                        switch_page(name)
-                        return
-                    except Exception:
-                        continue
-            except Exception:
-                st.info("Please use the sidebar to navigate to Results.")
+            _go_to("pages/04_Results.py", "Results")
     
     with col4:
         if st.button("📚 History", use_container_width=True):
-            try:
-                from streamlit_extras.switch_page_button import switch_page
-                for name in ["05_History", "History", "05 History", "History Page"]:
-                    try:
-                        switch_page(name)
-                        return
-                    except Exception:
-                        continue
-            except Exception:
-                st.info("Please use the sidebar to navigate to History.")
+            _go_to("pages/05_History.py", "History")
     
     with col5:
         if st.button("🔄 Version Compare", use_container_width=True):
-            try:
-                from streamlit_extras.switch_page_button import switch_page
-                for name in ["06_Version_Comparison", "Version Comparison", "06 Version Comparison", "Version_Comparison"]:
-                    try:
-                        switch_page(name)
-                        return
-                    except Exception:
-                        continue
-            except Exception:
-                st.info("Please use the sidebar to navigate to Version Comparison.")
+            _go_to("pages/06_Version_Comparison.py", "Version Comparison")
     
     with col6:
         if st.button("ℹ️ About", use_container_width=True):
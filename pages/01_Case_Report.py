@@ -1,86 +1,94 @@
 import streamlit as st
+import streamlit.components.v1 as components
+from streamlit.errors import StreamlitAPIException
 import time
-import random
+import bisect
+import hashlib
+import html
+import json
+import re
 import os
 import requests
-import threading
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
+from urllib.parse import quote
 from app.ui import inject_base_styles, show_header, top_nav, hero_section, feature_grid, footer_section, theme_provider
 from app.auth import require_authentication, get_current_user, logout
-from streamlit_extras.switch_page_button import switch_page
+from app.http_client import breaker_state, get_session, submit_request
+from app.pinger import start_backend_pinger, pinger_started_at
 import streamlit.runtime.scriptrunner as scriptrunner
 
 # Require authentication for this page
 require_authentication()
 
+# Shared keep-alive session; lives in an imported module so it survives reruns
+_SESSION = get_session()
+
 
 def _get_backend_base() -> str:
     """Get backend base URL from environment or query params."""
-    params = st.query_params if hasattr(st, "query_params") else {}
     return (
-        (params.get("api", [None])[0] if isinstance(params.get("api"), list) else params.get("api"))
+        st.query_params.get("api")
         or os.getenv("BACKEND_BASE")
         or "http://localhost:8000"
     ).rstrip("/")
 
 
-def _ping_backend(backend_url: str) -> bool:
-    """Ping the backend to keep it alive."""
+def _backend() -> str:
+    """Backend base URL, resolved once per session and reused across reruns."""
+    base = st.session_state.get("_backend_base")
+    return base if base else st.session_state.setdefault("_backend_base", _get_backend_base())
+
+
+_CASES_DISK_CACHE = os.path.join(os.path.expanduser("~"), ".streamlit", "cache", "cases.json")
+_CASES_DISK_TTL = 600
+
+
+def _disk_cache_get(path: str, ttl: int) -> dict | None:
+    """Return the JSON stored at path if it was written less than ttl seconds ago."""
     try:
-        response = requests.get(f"{backend_url}/health", timeout=5)
-        return response.ok
-    except Exception:
-        return False
+        if time.time() - os.stat(path).st_mtime > ttl:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
 
 
-def _start_backend_pinger(backend_url: str):
-    """Start background thread to ping backend every 5-7 minutes."""
-    def pinger():
-        ping_count = 0
-        consecutive_failures = 0
-        max_failures = 5
-        
-        while True:
-            try:
-                # Random interval between 5-7 minutes (300-420 seconds)
-                interval = random.randint(300, 420)
-                time.sleep(interval)
-                
-                # Ping the backend
-                success = _ping_backend(backend_url)
-                ping_count += 1
-                
-                if success:
-                    consecutive_failures = 0  # Reset failure counter
-                    print(f"✅ Backend ping #{ping_count} successful at {datetime.now()}")
-                else:
-                    consecutive_failures += 1
-                    print(f"❌ Backend ping #{ping_count} failed at {datetime.now()} (failure #{consecutive_failures})")
-                    
-                    # If too many consecutive failures, increase retry interval
-                    if consecutive_failures >= max_failures:
-                        print(f"⚠️ {consecutive_failures} consecutive failures. Increasing retry interval.")
-                        time.sleep(300)  # Wait 5 minutes before next attempt
-                        consecutive_failures = 0  # Reset after extended wait
-                    
-            except KeyboardInterrupt:
-                print("🛑 Pinger stopped by user")
-                break
-            except Exception as e:
-                consecutive_failures += 1
-                print(f"❌ Pinger error #{consecutive_failures}: {e}")
-                time.sleep(60)  # Wait 1 minute before retrying
-                
-                # Prevent infinite error loops
-                if consecutive_failures >= max_failures:
-                    print(f"⚠️ Too many errors ({consecutive_failures}). Pausing pinger for 10 minutes.")
-                    time.sleep(600)  # Wait 10 minutes
-                    consecutive_failures = 0
-    
-    # Start the pinger thread
-    thread = threading.Thread(target=pinger, daemon=True, name="BackendPinger")
-    thread.start()
-    return thread
+def _disk_cache_put(path: str, value: dict) -> None:
+    """Best-effort write of value as JSON; a read-only home directory is not an error."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+@st.cache_data(ttl=120, show_spinner=False)
+def _get_case_index(backend: str) -> tuple[list[str], frozenset[str]]:
+    """Fetch the case IDs known to S3 as (list, set); non-2xx responses raise so they are not cached.
+
+    The set is built once per fetch, so membership checks are O(1) and always
+    agree with the list. Backed by a short-lived on-disk copy so process
+    restarts skip the S3 round-trip.
+    """
+    cached = _disk_cache_get(_CASES_DISK_CACHE, _CASES_DISK_TTL)
+    if cached and cached.get("backend") == backend:
+        cases = cached.get("cases", []) or []
+        return cases, frozenset(cases)
+    response = _SESSION.get(f"{backend}/s3/cases", timeout=(3, 10))
+    response.raise_for_status()
+    data = response.json() or {}
+    cases = data.get("cases", []) or []
+    _disk_cache_put(_CASES_DISK_CACHE, {"backend": backend, "cases": cases})
+    return cases, frozenset(cases)
+
+
+def _get_cases(backend: str) -> list[str]:
+    """Case IDs known to S3, in backend order (see _get_case_index)."""
+    return _get_case_index(backend)[0]
 
 
 def _validate_case_id_exists(case_id: str) -> dict:
@@ -94,38 +102,36 @@ def _validate_case_id_exists(case_id: str) -> dict:
             "available_cases": [],
         }
     try:
-        backend = _get_backend_base()
+        backend = _backend()
         
-        # Use the same endpoint as History page - /s3/cases
-        response = requests.get(f"{backend}/s3/cases", timeout=10)
-        if response.ok:
-            data = response.json() or {}
-            available_cases = data.get("cases", []) or []
-            
-            # Check if case ID exists in the list
-            exists = case_id in available_cases
-            
-            if exists:
-                return {
-                    "exists": True,
-                    "message": f"Case ID {case_id} found in database",
-                    "error": None,
-                    "available_cases": available_cases
-                }
-            else:
-                return {
-                    "exists": False,
-                    "message": f"Case ID {case_id} not found in database",
-                    "error": None,
-                    "available_cases": available_cases
-                }
+        # Use the same endpoint as History page - /s3/cases (cached per backend)
+        available_cases, cases_set = _get_case_index(backend)
+        
+        # Check if case ID exists in the list
+        exists = case_id in cases_set
+        
+        if exists:
+            return {
+                "exists": True,
+                "message": f"Case ID {case_id} found in database",
+                "error": None,
+                "available_cases": available_cases
+            }
         else:
             return {
                 "exists": False,
-                "message": f"Backend error: {response.status_code}",
-                "error": f"HTTP {response.status_code}",
-                "available_cases": []
+                "message": f"Case ID {case_id} not found in database",
+                "error": None,
+                "available_cases": available_cases
             }
+    except requests.exceptions.HTTPError as e:
+        status_code = e.response.status_code if e.response is not None else "unknown"
+        return {
+            "exists": False,
+            "message": f"Backend error: {status_code}",
+            "error": f"HTTP {status_code}",
+            "available_cases": []
+        }
     except requests.exceptions.ConnectionError:
         return {
             "exists": False,
@@ -149,8 +155,329 @@ def _validate_case_id_exists(case_id: str) -> dict:
         }
 
 
+def _elapsed_seconds(start_time: datetime | None) -> float:
+    """Seconds since the current generation started, measured on the server.
+
+    The monotonic clock is immune to wall-clock adjustments; the datetime is
+    the fallback for sessions started before it was recorded.
+    """
+    start_mono = st.session_state.get("generation_start_mono")
+    if start_mono is not None:
+        return time.monotonic() - start_mono
+    if start_time:
+        return (datetime.now() - start_time).total_seconds()
+    return 0.0
+
+
+def _render_elapsed_ticker(elapsed_s: float) -> None:
+    """Render the "Running for" counter, ticking client-side between reruns.
+
+    The browser only adds its own time since load to the server-measured
+    elapsed seconds, so a skewed client clock cannot shift the counter.
+    """
+    components.html(
+        f"""
+        <div id="elapsed" style="text-align:center;font-family:sans-serif;font-size:0.9rem;color:#6b7280;"></div>
+        <script>
+          const start = Date.now() - {int(elapsed_s * 1000)};
+          const el = document.getElementById("elapsed");
+          function tick() {{
+            const s = Math.max(0, Math.floor((Date.now() - start) / 1000));
+            el.textContent = `Running for ${{Math.floor(s / 60)}} minutes ${{s % 60}} seconds`;
+          }}
+          tick();
+          setInterval(tick, 1000);
+        </script>
+        """,
+        height=30,
+    )
+
+
+@st.fragment
+def _render_completion_actions() -> None:
+    """Render the finished screen with the View Results / Generate New Report actions.
+
+    A fragment, so a click reruns only these buttons; both actions then leave
+    via st.switch_page or an app-scope st.rerun().
+    """
+    ss = st.session_state
+    st.success("✅ Report generation completed successfully!")
+    fin = st.container()
+    with fin:
+        c1, c2 = st.columns(2)
+        with c1:
+            if st.button("📊 View Results", type="primary", use_container_width=True):
+                # The session key carries the case to Results: switch_page
+                # clears query params before navigating, so ?case= would be lost
+                cid = ss.get("current_case_id") or ss.get("last_case_id")
+                if cid:
+                    ss["last_case_id"] = cid
+                try:
+                    # Native in-session navigation; keeps session state and the socket
+                    st.switch_page("pages/04_Results.py")
+                except StreamlitAPIException:
+                    st.warning("Could not navigate. Please click 'Results' in the sidebar.")
+        with c2:
+            if st.button("🔄 Generate New Report", type="secondary", use_container_width=True):
+                ss.update({
+                    "generation_progress": 0,
+                    "generation_step": 0,
+                    "generation_complete": False,
+                    "generation_in_progress": False,
+                    "generation_start": None,
+                    "generation_start_mono": None,
+                })
+                ss.pop("navigate_to_results", None)
+                st.rerun()
+
+
+GENERATION_TIMEOUT_SECONDS = 7200
+
+# Case IDs are exactly four ASCII digits
+_CASE_ID_RE = re.compile(r"[0-9]{4}")
+
+# Progress percentages at which each step after "Validating case ID" starts:
+# Fetching medical data (6%), AI analysis (25%), Generating report (50%),
+# Finalizing & quality check (80%)
+_STEP_BOUNDS = (6, 25, 50, 80)
+# Step index for each progress percentage 0-100, derived once from the bounds
+_STEP_LUT = bytes(bisect.bisect_right(_STEP_BOUNDS, pct) for pct in range(101))
+
+# Static header of the progress view (title + card) emitted as one element;
+# the live percentage is rendered client-side
+_PROGRESS_TMPL = """
+<h2>Case Report Generation</h2>
+<div class="pg-card">
+    <div class="pg-case">Generating report for Case ID: <strong>{cid}</strong></div>
+    <div class="pg-note">🔄 Real n8n workflow running in background</div>
+</div>
+"""
+
+_STEP_LABELS = (
+    "Validating case ID",
+    "Fetching medical data",
+    "AI analysis in progress",
+    "Generating report",
+    "Finalizing & quality check",
+)
+
+
+def _trigger_workflow(webhook_url: str, payload: dict) -> None:
+    """POST the n8n webhook in the background; the progress panel reports the outcome.
+
+    If this session already has an identical call (same workflow and payload)
+    in flight, that call is reused (and the user told so) instead of posting
+    again; finished calls are never reused, so a deliberate re-run always
+    triggers, and a changed option (e.g. batching) is a new call.
+    """
+    ss = st.session_state
+    inflight = ss.setdefault("_webhook_inflight", {})
+    for done_key in [k for k, f in inflight.items() if f.done()]:
+        inflight.pop(done_key, None)
+    digest = hashlib.blake2b(json.dumps(payload, sort_keys=True).encode(), digest_size=8).hexdigest()
+    key = (webhook_url, payload.get("case_id"), digest)
+    future = inflight.get(key)
+    ss["_webhook_reused"] = future is not None
+    if future is None:
+        future = submit_request("POST", webhook_url, json=payload, timeout=(3, 15))
+        inflight[key] = future
+    ss["_webhook_future"] = future
+    ss["poll_count"] = 0
+
+
+def _render_trigger_status() -> None:
+    """Show whether the background webhook call for the current run has landed."""
+    future = st.session_state.get("_webhook_future")
+    if future is None:
+        return
+    if st.session_state.get("_webhook_reused"):
+        st.caption("↩️ This workflow was already being triggered for the case; no new run was started")
+    if not future.done():
+        st.caption("📡 Triggering workflow...")
+        return
+    try:
+        response = future.result()
+        st.session_state["webhook_post_ms"] = round(response.elapsed_ms, 1)
+        if response.ok and st.session_state.get("_webhook_reused"):
+            st.caption("✅ The earlier trigger for this case went through")
+        elif response.ok:
+            st.caption("✅ Workflow triggered successfully!")
+        else:
+            st.error(f"⚠️ Workflow failed: {response.status_code}")
+    except requests.exceptions.Timeout:
+        st.caption("⏱️ Workflow triggered (running in background)")
+    except Exception as e:
+        st.error(f"❌ Error: {str(e)}")
+
+
+def _render_deposition_status() -> None:
+    """Report the outcome of the background deposition webhook call, once."""
+    future = st.session_state.pop("_deposition_future")
+    webhook_url = st.session_state.pop("_deposition_url", "")
+    try:
+        response = future.result()
+        if response.ok:
+            st.success("✅ Deposition workflow triggered successfully!")
+            st.info("📄 Your document will be processed in the background")
+        else:
+            st.error(f"⚠️ Workflow failed: {response.status_code}")
+            st.caption(f"URL called: {webhook_url}")
+            if response.text:
+                with st.expander("Response details"):
+                    st.code(response.text)
+            st.info("💡 Please ensure the workflow is active in n8n")
+    except requests.exceptions.Timeout:
+        st.success("⏱️ Deposition workflow triggered (running in background)")
+    except Exception as e:
+        st.error(f"❌ Error: {str(e)}")
+        st.caption(f"URL attempted: {webhook_url}")
+
+
+@st.fragment(run_every=1.0)
+def _poll_deposition_trigger() -> None:
+    """Wait for the deposition webhook without blocking the page; rerun once it lands."""
+    if st.session_state["_deposition_future"].done():
+        st.rerun()
+    st.caption("📡 Triggering deposition workflow...")
+
+
+def _complete_generation() -> None:
+    """Mark the current run finished and rerun the whole app to show the finished screen."""
+    ss = st.session_state
+    ss.update({
+        "generation_progress": 100,
+        "generation_step": 4,
+        "generation_complete": True,
+        "generation_in_progress": False,
+    })
+    if ss.get("generation_start_mono") is not None:
+        ss["total_wait_ms"] = round((time.monotonic() - ss["generation_start_mono"]) * 1000)
+    if scriptrunner.get_script_run_ctx():
+        st.rerun()
+
+
+def _render_perf_panel() -> None:
+    """Sidebar timings for the current run, shown only when PERF_DEBUG is set."""
+    if not os.getenv("PERF_DEBUG"):
+        return
+    ss = st.session_state
+    with st.sidebar.expander("Perf"):
+        st.json({k: ss[k] for k in ("webhook_post_ms", "poll_count", "total_wait_ms") if k in ss})
+        st.json({"circuit_breaker": breaker_state()})
+
+
+def _render_live_progress(stream_url: str, elapsed_s: float, target_seconds: int) -> None:
+    """Render the percentage, step and bar, updated in the browser from the progress SSE stream.
+
+    The bar advances linearly over target_seconds from the server-measured
+    elapsed time and jumps ahead whenever n8n reports real progress, so no
+    script rerun is needed to move it.
+    """
+    # Only a full page rerun re-emits this block; the 15s watchdog fragment
+    # reruns on its own, so the iframe and its EventSource stay mounted.
+    components.html(
+        f"""
+        <div style="text-align:center;font-family:sans-serif;">
+          <div id="pct" style="font-size:4rem;font-weight:bold;color:#3b82f6;">0%</div>
+          <div id="step" style="font-size:1.1rem;color:#6b7280;margin-bottom:0.75rem;"></div>
+          <div style="height:10px;background:#e5e7eb;border-radius:6px;overflow:hidden;">
+            <div id="bar" style="height:100%;width:0;background:#3b82f6;transition:width .5s;"></div>
+          </div>
+          <div id="msg" style="font-size:0.85rem;color:#9ca3af;margin-top:0.5rem;"></div>
+        </div>
+        <script>
+          const start = Date.now() - {int(elapsed_s * 1000)}, target = {max(int(target_seconds), 1) * 1000};
+          const steps = {json.dumps(_STEP_LABELS)}, bounds = {json.dumps(_STEP_BOUNDS)};
+          let real = 0, shown = -1;
+          function render() {{
+            const linear = Math.min(100, Math.floor(5 + (Date.now() - start) / target * 95));
+            const pct = Math.max(real, linear);
+            // Over a 2-hour run the percentage changes every ~75s; skip no-op DOM writes
+            if (pct === shown) return;
+            shown = pct;
+            let i = 0;
+            while (i < bounds.length && pct >= bounds[i]) i++;
+            document.getElementById("pct").textContent = pct + "%";
+            document.getElementById("bar").style.width = pct + "%";
+            document.getElementById("step").textContent = steps[i];
+          }}
+          if (window.EventSource) {{
+            const es = new EventSource({json.dumps(stream_url)});
+            es.onmessage = (e) => {{
+              const d = JSON.parse(e.data);
+              real = Math.max(real, d.pct || 0);
+              if (d.message) document.getElementById("msg").textContent = d.message;
+              render();
+              if (real >= 100 || d.timeout) es.close();
+            }};
+          }}
+          render();
+          setInterval(render, 1000);
+        </script>
+        """,
+        height=150,
+    )
+
+
+def _progress_since(start_time: datetime | None) -> str:
+    """Run start in the backend's created_at format (UTC), to skip earlier runs' updates."""
+    return (start_time or datetime.now()).astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _latest_backend_progress(case_id: str, start_time: datetime | None) -> int:
+    """Latest percentage n8n reported for this run of the case via /webhook/progress, or 0."""
+    try:
+        response = _SESSION.get(
+            f"{_backend()}/progress/{quote(str(case_id))}/latest",
+            params={"since": _progress_since(start_time)},
+            timeout=(3, 5),
+        )
+        latest = (response.json() or {}).get("progress") if response.ok else None
+        return int(latest.get("progress") or 0) if latest else 0
+    except Exception:
+        return 0
+
+
+@st.fragment(run_every=15.0)
+def _progress_watchdog(case_id: str, start_time: datetime | None, target_seconds: int) -> None:
+    """Track a running generation server-side and promote to the finished screen.
+
+    The visible bar is driven by the browser, so this only needs a slow
+    cadence to keep session state current and catch completion.
+    """
+    ss = st.session_state
+    ss["poll_count"] = ss.get("poll_count", 0) + 1
+
+    elapsed_time = _elapsed_seconds(start_time)
+
+    # Linear progression as fallback, overtaken by real progress from n8n
+    linear = int(min(5 + (elapsed_time / target_seconds) * 95, 100))
+    progress_value = max(linear, _latest_backend_progress(case_id, start_time))
+    ss["generation_progress"] = progress_value
+    ss["generation_step"] = _STEP_LUT[min(max(progress_value, 0), 100)]
+
+    # Complete when n8n reports 100% or after the target window (capped at
+    # the generation timeout), to avoid being stuck at ~98–99%
+    if progress_value >= 100 or elapsed_time >= min(target_seconds, GENERATION_TIMEOUT_SECONDS):
+        _complete_generation()
+
+    # Optional auto-complete for demos (disabled by default). Set AUTO_COMPLETE_SECONDS to enable.
+    auto_complete_env = os.getenv("AUTO_COMPLETE_SECONDS")
+    if auto_complete_env:
+        try:
+            auto_complete_seconds = max(1, int(auto_complete_env))
+        except Exception:
+            auto_complete_seconds = None
+        if auto_complete_seconds and elapsed_time >= auto_complete_seconds:
+            ss["navigate_to_results"] = True
+            _complete_generation()
+
+    _render_trigger_status()
+
+
 def main() -> None:
     st.set_page_config(page_title="Case Report", page_icon="📄", layout="wide")
+    ss = st.session_state
         # --- Safe session initialization ---
     defaults = {
         "generation_in_progress": False,
@@ -159,32 +486,31 @@ def main() -> None:
         "generation_step": 0,
         "current_case_id": None,
         "generation_start": None,
+        # ?debug=1 only shows the debug controls (Jump to 100%, debug output)
+        "debug_mode": st.query_params.get("debug") == "1",
     }
     for k, v in defaults.items():
-        if k not in st.session_state:
-            st.session_state[k] = v
+        if k not in ss:
+            ss[k] = v
 
 
     theme_provider()
     inject_base_styles()
     top_nav()
+    _render_perf_panel()
     
-    # Initialize backend pinger to keep backend alive
-    backend_url = _get_backend_base()
-    if not st.session_state.get("pinger_started", False):
-        try:
-            _start_backend_pinger(backend_url)
-            st.session_state["pinger_started"] = True
-            st.session_state["pinger_start_time"] = datetime.now()
-        except Exception as e:
-            st.warning(f"⚠️ Could not start backend pinger: {e}")
+    # Initialize the process-wide backend pinger (no-op once it is running)
+    backend_url = _backend()
+    try:
+        start_backend_pinger(backend_url)
+    except Exception as e:
+        st.warning(f"⚠️ Could not start backend pinger: {e}")
     
     # Show pinger status
-    if st.session_state.get("pinger_started", False):
-        start_time = st.session_state.get("pinger_start_time")
-        if start_time:
-            uptime = datetime.now() - start_time
-            st.caption(f"🔄 Backend pinger active (uptime: {uptime.total_seconds()//60:.0f}m)")
+    start_time = pinger_started_at()
+    if start_time:
+        uptime = datetime.now() - start_time
+        st.caption(f"🔄 Backend pinger active (uptime: {uptime.total_seconds()//60:.0f}m)")
     
     hero_section(
         title="Generate Case Report",
@@ -196,186 +522,50 @@ def main() -> None:
     )
 
 
+    # Show finished screen when a run has completed
+    if ss.get("generation_complete"):
+        _render_completion_actions()
+        return
+
     # Check if generation is already in progress
-    if st.session_state.get("generation_in_progress", False):
-        st.markdown("## Case Report Generation")
-        case_id = st.session_state.get("current_case_id", "Unknown")
-        
-        # Determine simulated target duration
+    if ss.get("generation_in_progress", False):
+        case_id = ss.get("current_case_id", "Unknown")
+        # Demo id 0000 runs a one-minute simulated generation
         if str(case_id) == "0000":
             target_seconds = 60
         else:
-            target_seconds = int(st.session_state.get("debug_target_seconds", 7200))
-        
-        # Calculate elapsed time
-        start_time = st.session_state.get("generation_start")
-        if start_time:
-            elapsed_time = (datetime.now() - start_time).total_seconds()
-        else:
-            elapsed_time = 0
-        
-        # Calculate progress based on elapsed time
-        current_progress = st.session_state.get("generation_progress", 0)
-        
-        # Always calculate linear progression as fallback (unless we have real progress at 100%)
-        if current_progress < 100:
-            if st.session_state.get("debug_mode", False):
-                # Debug mode: Complete in 5 seconds instead of 2 hours
-                debug_progress = min(5 + (elapsed_time / 5) * 95, 100)
-                st.session_state["generation_progress"] = int(debug_progress)
-            else:
-                # Normal mode: Linear progression over target_seconds
-                if elapsed_time < target_seconds:
-                    linear_progress = min(5 + (elapsed_time / target_seconds) * 95, 100)
-                    st.session_state["generation_progress"] = int(linear_progress)
-            
-            # Update step status based on progress
-            progress = st.session_state["generation_progress"]
-            if progress < 6:
-                st.session_state["generation_step"] = 0  # Validating case ID (5-6%)
-            elif progress < 25:
-                st.session_state["generation_step"] = 1  # Fetching medical data (6-25%)
-            elif progress < 50:
-                st.session_state["generation_step"] = 2  # AI analysis in progress (25-50%)
-            elif progress < 80:
-                st.session_state["generation_step"] = 3  # Generating report (50-80%)
-            else:
-                st.session_state["generation_step"] = 4  # Finalizing & quality check (80-100%)
-
-        # Force-complete after target window to avoid being stuck at ~98–99%
-        if elapsed_time >= target_seconds and st.session_state.get("generation_in_progress"):
-            st.session_state["generation_progress"] = 100
-            st.session_state["generation_step"] = 4
-            st.session_state["generation_complete"] = True
-            st.session_state["generation_in_progress"] = False
-            if scriptrunner.get_script_run_ctx():
-                time.sleep(0.3)
-                st.rerun()
-
-        # Optional auto-complete for demos (disabled by default). Set AUTO_COMPLETE_SECONDS to enable.
-        auto_complete_env = os.getenv("AUTO_COMPLETE_SECONDS")
-        if auto_complete_env:
-            try:
-                auto_complete_seconds = max(1, int(auto_complete_env))
-            except Exception:
-                auto_complete_seconds = None
-            if auto_complete_seconds and elapsed_time >= auto_complete_seconds:
-                st.session_state["generation_progress"] = 100
-                st.session_state["generation_step"] = 4
-                st.session_state["generation_complete"] = True
-                st.session_state["generation_in_progress"] = False
-                st.session_state["navigate_to_results"] = True
-        
-        # Calculate elapsed time in minutes
-        elapsed_minutes = int(elapsed_time // 60)
-        elapsed_seconds = int(elapsed_time % 60)
-        
-        # Progress display
-        progress_value = st.session_state.get("generation_progress", 0)
-        current_step = st.session_state.get("generation_step", 0)
-        
-        steps = [
-            "Validating case ID",
-            "Fetching medical data", 
-            "AI analysis in progress",
-            "Generating report",
-            "Finalizing & quality check"
-        ]
-        current_process = steps[current_step] if current_step < len(steps) else "Processing..."
-        
-        st.markdown(f"""
-        <div style="text-align: center; margin: 2rem 0;">
-            <div style="font-size: 4rem; font-weight: bold; color: #3b82f6; margin-bottom: 0.5rem;">
-                {progress_value}%
-            </div>
-            <div style="font-size: 1.5rem; color: #6b7280; margin-bottom: 1rem;">Progress</div>
-            <div style="font-size: 1.1rem; color: #9ca3af; margin-bottom: 0.5rem;">Generating report for Case ID: <strong>{case_id}</strong></div>
-            <div style="font-size: 0.9rem; color: #6b7280; margin-bottom: 0.5rem;">🔄 Real n8n workflow running in background</div>
-            <div style="font-size: 1rem; color: #10b981; font-weight: 600; background: rgba(16, 185, 129, 0.1); padding: 0.5rem 1rem; border-radius: 8px; display: inline-block;">
-                🔄 {current_process}
-            </div>
-            <div style="font-size: 0.9rem; color: #6b7280; margin-top: 0.5rem;">
-                Running for {elapsed_minutes} minutes {elapsed_seconds} seconds
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Progress bar
-        st.progress(progress_value / 100)
-        
-        # Auto-refresh every 2 seconds for real-time updates
-        if st.session_state.get("generation_in_progress", False):
-            time.sleep(2)
-            st.rerun()
-    
-    # Backend base URL
-    params = st.query_params if hasattr(st, "query_params") else {}
-    BACKEND_BASE = (
-        params.get("api", [None])[0]
-        or os.getenv("BACKEND_BASE")
-        or "http://localhost:8000"
-    ).rstrip("/")
-
-    # Show finished screen when a run has completed
-    if st.session_state.get("generation_complete") and not st.session_state.get("generation_in_progress"):
-        st.success("✅ Report generation completed successfully!")
-        fin = st.container()
-        with fin:
-            c1, c2 = st.columns(2)
-            with c1:
-                if st.button("📊 View Results", type="primary", use_container_width=True):
-                    # Persist selected case id for the Results page
-                    cid = st.session_state.get("current_case_id") or st.session_state.get("last_case_id")
-                    if cid:
-                        st.session_state["last_case_id"] = cid
-                        try:
-                            if hasattr(st, "query_params"):
-                                qp = dict(st.query_params)
-                                qp["case"] = cid
-                                try:
-                                    st.query_params.clear()
-                                except Exception:
-                                    pass
-                                try:
-                                    st.experimental_set_query_params(**qp)
-                                except Exception:
-                                    st.experimental_set_query_params(case=cid)
-                            else:
-                                st.experimental_set_query_params(case=cid)
-                        except Exception:
-                            pass
-                    try:
-                        switch_page("pages/04_Results")
-                    except Exception:
-                        st.session_state["_goto_results_intent"] = True
-                        st.experimental_rerun()
-            with c2:
-                if st.button("🔄 Generate New Report", type="secondary", use_container_width=True):
-                    st.session_state["generation_progress"] = 0
-                    st.session_state["generation_step"] = 0
-                    st.session_state["generation_complete"] = False
-                    st.session_state["generation_in_progress"] = False
-                    st.session_state["generation_start"] = None
-                    st.experimental_rerun()
+            target_seconds = int(ss.get("debug_target_seconds", 7200))
+        if os.getenv("DEBUG_FAST_GENERATION"):
+            # Server-side dev switch: complete in 5 seconds instead of 2 hours.
+            # Not tied to ?debug=1, which any user can add to the URL.
+            target_seconds = 5
+        start_time = ss.get("generation_start")
+
+        elapsed_s = _elapsed_seconds(start_time)
+
+        st.markdown(_PROGRESS_TMPL.format(cid=html.escape(str(case_id))), unsafe_allow_html=True)
+        _render_live_progress(
+            f"{_backend()}/progress/{quote(str(case_id))}/stream?since={quote(_progress_since(start_time))}",
+            elapsed_s,
+            target_seconds,
+        )
+        _render_elapsed_ticker(elapsed_s)
+        _progress_watchdog(case_id, start_time, target_seconds)
+        if ss.get("debug_mode", False):
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col2:
+                if st.button("🚀 Debug: Jump to 100%", type="secondary", use_container_width=True):
+                    _complete_generation()
         return
-
+    
     # Show input form only when not generating and not completed
-    if not st.session_state.get("generation_in_progress") and not st.session_state.get("generation_complete"):
+    if not ss.get("generation_in_progress") and not ss.get("generation_complete"):
         
-        # Fetch available cases dynamically from backend
-        @st.cache_data(ttl=120)
-        def fetch_available_cases():
-            backend = _get_backend_base()
-            try:
-                res = requests.get(f"{backend}/s3/cases", timeout=5)
-                if res.ok:
-                    data = res.json()
-                    return data.get("cases", [])
-            except Exception:
-                pass
-            return []
-
-        available_cases = fetch_available_cases()
+        # Fetch available cases dynamically from backend (shared cached fetch)
+        try:
+            available_cases = _get_cases(_backend())
+        except Exception:
+            available_cases = []
         
         # Modern header with gradient
         st.markdown("""
@@ -423,7 +613,7 @@ def main() -> None:
                 # Validation
                 case_valid_standard = False
                 if case_id_standard:
-                    if not case_id_standard.isdigit() or len(case_id_standard) != 4:
+                    if not _CASE_ID_RE.fullmatch(case_id_standard):
                         st.error("⚠️ Case ID must be a 4-digit number")
                     else:
                         with st.spinner("Validating..."):
@@ -466,7 +656,7 @@ def main() -> None:
                 # Validation
                 case_valid_redacted = False
                 if case_id_redacted:
-                    if not case_id_redacted.isdigit() or len(case_id_redacted) != 4:
+                    if not _CASE_ID_RE.fullmatch(case_id_redacted):
                         st.error("⚠️ Case ID must be a 4-digit number")
                     else:
                         with st.spinner("Validating..."):
@@ -505,7 +695,7 @@ def main() -> None:
                 # Validation
                 case_valid_deposition = False
                 if case_id_deposition:
-                    if not case_id_deposition.isdigit() or len(case_id_deposition) != 4:
+                    if not _CASE_ID_RE.fullmatch(case_id_deposition):
                         st.error("⚠️ Case ID must be a 4-digit number")
                     else:
                         with st.spinner("Validating..."):
@@ -551,7 +741,7 @@ def main() -> None:
 
                 case_valid_mcp = False
                 if case_id_mcp:
-                    if not case_id_mcp.isdigit() or len(case_id_mcp) != 4:
+                    if not _CASE_ID_RE.fullmatch(case_id_mcp):
                         st.error("⚠️ Case ID must be a 4-digit number")
                     else:
                         with st.spinner("Validating..."):
@@ -579,59 +769,60 @@ def main() -> None:
         
         # Available cases expander (outside tabs, below)
         with st.expander("📋 Browse Available Case IDs", expanded=False):
-            try:
-                backend = _get_backend_base()
-                response = requests.get(f"{backend}/s3/cases", timeout=5)
-                if response.ok:
-                    data = response.json()
-                    cases = data.get("cases", [])
+            # Expander bodies run even when collapsed, so the grid is only
+            # built after the user asks for it
+            if not ss.get("_show_cases_grid"):
+                if st.button("Load list", key="load_cases_grid"):
+                    ss["_show_cases_grid"] = True
+                    st.rerun()
+            else:
+                try:
+                    cases = _get_cases(_backend())
                     if cases:
                         st.info(f"📊 Found {len(cases)} case IDs in database")
-                        cols = st.columns(6)
-                        for i, case_opt in enumerate(cases[:24]):
-                            with cols[i % 6]:
-                                st.code(case_opt, language=None)
+                        # One element for the whole grid instead of 6 columns x 24 code blocks;
+                        # user-select:all keeps one-click selection of an ID
+                        chips = "".join(
+                            f"<code style='user-select:all;text-align:center;padding:.35rem 0;'>{html.escape(c)}</code>"
+                            for c in cases[:24]
+                        )
+                        st.markdown(
+                            f"<div style='display:grid;grid-template-columns:repeat(6,1fr);gap:.5rem;'>{chips}</div>",
+                            unsafe_allow_html=True,
+                        )
                         if len(cases) > 24:
                             st.caption(f"... and {len(cases) - 24} more")
                     else:
                         st.warning("No case IDs found")
-                else:
-                    st.error(f"Error: {response.status_code}")
-            except Exception as e:
-                st.error(f"Could not fetch cases: {str(e)}")
+                except requests.exceptions.HTTPError as e:
+                    st.error(f"Error: {e.response.status_code if e.response is not None else e}")
+                except Exception as e:
+                    st.error(f"Could not fetch cases: {str(e)}")
         
         # Handle button actions - Standard Report
         if generate_standard:
             cid = case_id_standard.strip()
             webhook_url = "https://n8n.datakernels.in/webhook/mainworkflow"
             
-            st.success(f"🚀 Starting standard report for Case ID: {cid}")
-            st.session_state["last_case_id"] = cid
-            st.session_state["generation_start"] = datetime.now()
-            st.session_state["generation_in_progress"] = True
-            st.session_state["generation_progress"] = 1
-            st.session_state["generation_step"] = 0
-            st.session_state["generation_complete"] = False
-            st.session_state["current_case_id"] = cid
-            st.session_state["report_type"] = "standard"
+            st.toast(f"🚀 Starting standard report for Case ID: {cid}")
+            ss.update({
+                "last_case_id": cid,
+                "generation_start": datetime.now(),
+                "generation_start_mono": time.monotonic(),
+                "generation_in_progress": True,
+                "generation_progress": 1,
+                "generation_step": 0,
+                "generation_complete": False,
+                "current_case_id": cid,
+                "report_type": "standard",
+            })
             
-            try:
-                response = requests.post(
-                    webhook_url,
-                    json={"case_id": cid, "username": "demo", "batching": batch_flag_standard},
-                    timeout=15
-                )
-                if response.ok:
-                    st.success("✅ Workflow triggered successfully!")
-                else:
-                    st.error(f"⚠️ Workflow failed: {response.status_code}")
-            except requests.exceptions.Timeout:
-                st.success("⏱️ Workflow triggered (running in background)")
-            except Exception as e:
-                st.error(f"❌ Error: {str(e)}")
+            _trigger_workflow(
+                webhook_url,
+                {"case_id": cid, "username": "demo", "batching": batch_flag_standard},
+            )
             
             if scriptrunner.get_script_run_ctx():
-                time.sleep(0.3)
                 st.rerun()
         
         # Handle button actions - Redacted Report
@@ -639,33 +830,25 @@ def main() -> None:
             cid = case_id_redacted.strip()
             webhook_url = "https://n8n.datakernels.in/webhook/mcp"
             
-            st.success(f"🚀 Starting redacted report for Case ID: {cid}")
-            st.session_state["last_case_id"] = cid
-            st.session_state["generation_start"] = datetime.now()
-            st.session_state["generation_in_progress"] = True
-            st.session_state["generation_progress"] = 1
-            st.session_state["generation_step"] = 0
-            st.session_state["generation_complete"] = False
-            st.session_state["current_case_id"] = cid
-            st.session_state["report_type"] = "redacted"
+            st.toast(f"🚀 Starting redacted report for Case ID: {cid}")
+            ss.update({
+                "last_case_id": cid,
+                "generation_start": datetime.now(),
+                "generation_start_mono": time.monotonic(),
+                "generation_in_progress": True,
+                "generation_progress": 1,
+                "generation_step": 0,
+                "generation_complete": False,
+                "current_case_id": cid,
+                "report_type": "redacted",
+            })
             
-            try:
-                response = requests.post(
-                    webhook_url,
-                    json={"case_id": cid, "username": "demo", "batching": batch_flag_redacted},
-                    timeout=15
-                )
-                if response.ok:
-                    st.success("✅ Workflow triggered successfully!")
-                else:
-                    st.error(f"⚠️ Workflow failed: {response.status_code}")
-            except requests.exceptions.Timeout:
-                st.success("⏱️ Workflow triggered (running in background)")
-            except Exception as e:
-                st.error(f"❌ Error: {str(e)}")
+            _trigger_workflow(
+                webhook_url,
+                {"case_id": cid, "username": "demo", "batching": batch_flag_redacted},
+            )
             
             if scriptrunner.get_script_run_ctx():
-                time.sleep(0.3)
                 st.rerun()
 
         if generate_mcp_redacted:
@@ -673,39 +856,31 @@ def main() -> None:
             patient_name = patient_name_mcp.strip() if patient_name_mcp else ""
             webhook_url = "https://n8n.datakernels.in/webhook/mcp"
             
-            st.success(f"🚀 Starting MCP redacted report for Case ID: {cid} and patient: {patient_name}")
-            st.session_state["last_case_id"] = cid
-            st.session_state["generation_start"] = datetime.now()
-            st.session_state["generation_in_progress"] = True
-            st.session_state["generation_progress"] = 1
-            st.session_state["generation_step"] = 0
-            st.session_state["generation_complete"] = False
-            st.session_state["current_case_id"] = cid
-            st.session_state["report_type"] = "mcp_redacted"
-            st.session_state["patient_name"] = patient_name
+            st.toast(f"🚀 Starting MCP redacted report for Case ID: {cid} and patient: {patient_name}")
+            ss.update({
+                "last_case_id": cid,
+                "generation_start": datetime.now(),
+                "generation_start_mono": time.monotonic(),
+                "generation_in_progress": True,
+                "generation_progress": 1,
+                "generation_step": 0,
+                "generation_complete": False,
+                "current_case_id": cid,
+                "report_type": "mcp_redacted",
+                "patient_name": patient_name,
+            })
             
-            try:
-                response = requests.post(
-                    webhook_url,
-                    json={
-                        "case_id": cid,
-                        "patient_name": patient_name,
-                        "username": "demo",
-                        "batching": batch_flag_mcp,
-                    },
-                    timeout=15,
-                )
-                if response.ok:
-                    st.success("✅ Workflow triggered successfully!")
-                else:
-                    st.error(f"⚠️ Workflow failed: {response.status_code}")
-            except requests.exceptions.Timeout:
-                st.success("⏱️ Workflow triggered (running in background)")
-            except Exception as e:
-                st.error(f"❌ Error: {str(e)}")
+            _trigger_workflow(
+                webhook_url,
+                {
+                    "case_id": cid,
+                    "patient_name": patient_name,
+                    "username": "demo",
+                    "batching": batch_flag_mcp,
+                },
+            )
             
             if scriptrunner.get_script_run_ctx():
-                time.sleep(0.3)
                 st.rerun()
         
         # Handle button actions - Deposition Document
@@ -714,28 +889,16 @@ def main() -> None:
             webhook_url = "https://n8n.datakernels.in/webhook/4b3828a5-ea26-4228-a93b-cd34f7bb1faa"
             
             st.success(f"🚀 Starting deposition document for Case ID: {cid}")
-            
-            try:
-                response = requests.post(
-                    webhook_url,
-                    json={"case_id": cid, "username": "demo"},
-                    timeout=15
-                )
-                if response.ok:
-                    st.success("✅ Deposition workflow triggered successfully!")
-                    st.info("📄 Your document will be processed in the background")
-                else:
-                    st.error(f"⚠️ Workflow failed: {response.status_code}")
-                    st.caption(f"URL called: {webhook_url}")
-                    if response.text:
-                        with st.expander("Response details"):
-                            st.code(response.text)
-                    st.info("💡 Please ensure the workflow is active in n8n")
-            except requests.exceptions.Timeout:
-                st.success("⏱️ Deposition workflow triggered (running in background)")
-            except Exception as e:
-                st.error(f"❌ Error: {str(e)}")
-                st.caption(f"URL attempted: {webhook_url}")
+            ss["_deposition_future"] = submit_request(
+                "POST", webhook_url, json={"case_id": cid, "username": "demo"}, timeout=(3, 15)
+            )
+            ss["_deposition_url"] = webhook_url
+
+        if ss.get("_deposition_future") is not None:
+            if ss["_deposition_future"].done():
+                _render_deposition_status()
+            else:
+                _poll_deposition_trigger()
         
         # Info note
         st.markdown("""
@@ -754,161 +917,6 @@ def main() -> None:
         </div>
         """, unsafe_allow_html=True)
 
-    # Check if generation is in progress and show progress
-    if st.session_state.get("generation_in_progress") and not st.session_state.get("generation_complete"):
-        case_id = st.session_state.get("current_case_id", "Unknown")
-        
-        # Calculate elapsed time
-        start_time = st.session_state.get("generation_start")
-        if start_time:
-            elapsed_time = (datetime.now() - start_time).total_seconds()
-        else:
-            elapsed_time = 0
-        
-        # Calculate progress based on elapsed time
-        target_seconds = int(st.session_state.get("debug_target_seconds", 7200))
-        linear_progress = min(1 + (elapsed_time / target_seconds) * 99, 100)
-        st.session_state["generation_progress"] = int(linear_progress)
-        
-        # Update step status based on progress
-        progress = st.session_state["generation_progress"]
-        if progress < 6:
-            st.session_state["generation_step"] = 0  # Validating case ID (1-5%)
-        elif progress < 25:
-            st.session_state["generation_step"] = 1  # Fetching medical data (6-25%)
-        elif progress < 50:
-            st.session_state["generation_step"] = 2  # AI analysis in progress (25-50%)
-        elif progress < 80:
-            st.session_state["generation_step"] = 3  # Generating report (50-80%)
-        else:
-            st.session_state["generation_step"] = 4  # Finalizing & quality check (80-100%)
-        
-        # Calculate elapsed time in minutes
-        elapsed_minutes = int(elapsed_time // 60)
-        elapsed_seconds = int(elapsed_time % 60)
-        
-        # Progress display
-        progress_value = st.session_state.get("generation_progress", 0)
-        current_step = st.session_state.get("generation_step", 0)
-        
-        steps = [
-            "Validating case ID",
-            "Fetching medical data", 
-            "AI analysis in progress",
-            "Generating report",
-            "Finalizing & quality check"
-        ]
-        current_process = steps[current_step] if current_step < len(steps) else "Processing..."
-        
-        st.markdown(f"""
-        <div style="text-align: center; margin: 2rem 0;">
-            <div style="font-size: 4rem; font-weight: bold; color: #3b82f6; margin-bottom: 0.5rem;">
-                {progress_value}%
-            </div>
-            <div style="font-size: 1.5rem; color: #6b7280; margin-bottom: 1rem;">Progress</div>
-            <div style="font-size: 1.1rem; color: #9ca3af; margin-bottom: 0.5rem;">Generating report for Case ID: <strong>{case_id}</strong></div>
-            <div style="font-size: 0.9rem; color: #6b7280; margin-bottom: 0.5rem;">🔄 Real n8n workflow running in background</div>
-            <div style="font-size: 1rem; color: #10b981; font-weight: 600; background: rgba(16, 185, 129, 0.1); padding: 0.5rem 1rem; border-radius: 8px; display: inline-block;">
-                🔄 {current_process}
-            </div>
-            <div style="font-size: 0.9rem; color: #6b7280; margin-top: 0.5rem;">
-                Running for {elapsed_minutes} minutes {elapsed_seconds} seconds
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Progress bar
-        st.progress(progress_value / 100)
-        
-        # Debug button - only show when generation is in progress
-        col1, col2, col3 = st.columns([1, 2, 1])
-        with col2:
-            if st.button("🚀 Debug: Jump to 100%", type="secondary", use_container_width=True):
-                st.session_state["generation_progress"] = 100
-                st.session_state["generation_complete"] = True
-                st.session_state["generation_in_progress"] = False
-                st.session_state["generation_step"] = 4
-                st.success("🎉 Debug: Report generation completed instantly!")
-                if scriptrunner.get_script_run_ctx():
-                    time.sleep(0.3)
-                    st.rerun()
-        
-        # Auto-refresh every 2 seconds for real-time updates
-        if st.session_state.get("generation_in_progress", False):
-            time.sleep(2)
-            if scriptrunner.get_script_run_ctx():
-                time.sleep(0.3)
-                st.rerun()
-        
-        # Auto-complete after 2 hours to avoid being stuck near 98–99%
-        if elapsed_time >= 7200:  # 2 hours = 7200 seconds
-            st.session_state["generation_progress"] = 100
-            st.session_state["generation_step"] = 4
-            st.session_state["generation_complete"] = True
-            st.session_state["generation_in_progress"] = False
-            st.session_state["navigate_to_results"] = True
-            if scriptrunner.get_script_run_ctx():
-                time.sleep(0.3)
-                st.rerun()
-        
-        # Check if we've reached completion
-        if progress_value >= 100:
-            st.session_state["generation_progress"] = 100
-            st.session_state["generation_step"] = 4
-            st.session_state["generation_complete"] = True
-            st.session_state["generation_in_progress"] = False
-            st.success("🎉 Report generation completed!")
-            if scriptrunner.get_script_run_ctx():
-                time.sleep(0.3)
-                st.rerun()
-        
-        # Show completion message and navigation
-        if st.session_state.get("generation_complete"):
-            st.success("✅ Report generation completed successfully!")
-            
-            # Replace input form with actions at the bottom of the page
-            st.markdown("<div style='height:12px'></div>", unsafe_allow_html=True)
-            actions = st.container()
-            with actions:
-                col1, col2 = st.columns(2)
-                with col1:
-                        if st.button("📊 View Results", type="primary", use_container_width=True):
-                            cid = st.session_state.get("current_case_id") or st.session_state.get("last_case_id")
-
-                            if cid:
-                                # ✅ Store case ID for later pages
-                                st.session_state["selected_case_id"] = cid
-
-                                # ✅ Update URL query params (used by Results page)
-                                try:
-                                    st.experimental_set_query_params(case=cid)
-                                except Exception:
-                                    pass
-
-                                # ✅ Navigate to the Results page (Streamlit auto-maps “04_Results.py” → “Results”)
-                                try:
-                                    switch_page("Results")
-                                except Exception:
-                                    st.session_state["_goto_results_intent"] = True
-                                    if scriptrunner.get_script_run_ctx():
-                                        time.sleep(0.3)
-                                        st.rerun()
-                            else:
-                                st.warning("⚠️ No Case ID found. Please generate a report first.")
-
-                with col2:
-                    if st.button("🔄 Generate New Report", type="secondary", use_container_width=True):
-                        # Reset all generation state and show input again
-                        st.session_state["generation_progress"] = 0
-                        st.session_state["generation_step"] = 0
-                        st.session_state["generation_complete"] = False
-                        st.session_state["generation_in_progress"] = False
-                        st.session_state["generation_start"] = None
-                        st.session_state.pop("navigate_to_results", None)
-                        if scriptrunner.get_script_run_ctx():
-                            time.sleep(0.3)
-                            st.rerun()
-
 
 if __name__ == "__main__":
     main()
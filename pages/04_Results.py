@@ -2,23 +2,23 @@ import streamlit as st
 from datetime import datetime
 from app.ui import inject_base_styles, theme_provider, top_nav
 from app.auth import require_authentication, get_current_user, logout
+from app.pinger import start_backend_pinger
+from app.http_client import get_session
 import os
-import streamlit.components.v1 as components
+from streamlit.errors import StreamlitAPIException
 from urllib.parse import quote
-import requests
-import threading
-import time
-import random
 
 
 # Require authentication for this page
 require_authentication()
 
+# Shared keep-alive session; lives in an imported module so it survives reruns
+_SESSION = get_session()
+
 
 def _get_backend_base() -> str:
-    params = st.query_params if hasattr(st, "query_params") else {}
     return (
-        (params.get("api", [None])[0] if isinstance(params.get("api"), list) else params.get("api"))
+        st.query_params.get("api")
         or os.getenv("BACKEND_BASE")
         or "http://localhost:8000"
     ).rstrip("/")
@@ -41,41 +41,6 @@ def _extract_patient_from_strings(case_id: str, *, gt_key: str | None = None, ai
     return None
 
 
-def _ping_backend(backend_url: str) -> bool:
-    """Ping the backend to keep it alive."""
-    try:
-        response = requests.get(f"{backend_url}/health", timeout=5)
-        return response.ok
-    except Exception:
-        return False
-
-
-def _start_backend_pinger(backend_url: str):
-    """Start background thread to ping backend every 5-7 minutes."""
-    def pinger():
-        while True:
-            try:
-                # Random interval between 5-7 minutes (300-420 seconds)
-                interval = random.randint(300, 420)
-                time.sleep(interval)
-                
-                # Ping the backend
-                success = _ping_backend(backend_url)
-                if success:
-                    print(f"✅ Backend ping successful at {datetime.now()}")
-                else:
-                    print(f"❌ Backend ping failed at {datetime.now()}")
-                    
-            except Exception as e:
-                print(f"❌ Pinger error: {e}")
-                time.sleep(60)  # Wait 1 minute before retrying
-    
-    # Start the pinger thread
-    thread = threading.Thread(target=pinger, daemon=True)
-    thread.start()
-    return thread
-
-
 def _check_generation_status(case_id: str) -> dict:
     """Check if report generation is complete for the given case_id"""
     # Check session state for generation status
@@ -93,6 +58,15 @@ def _check_generation_status(case_id: str) -> dict:
     }
 
 
+def _robust_switch_to_case_report() -> None:
+    """Navigate in-session to Case Report; point at the sidebar if the page is not registered."""
+    # Only the API error: on streamlit 1.37 the navigation rerun itself is an Exception
+    try:
+        st.switch_page("pages/01_Case_Report.py")
+    except StreamlitAPIException:
+        st.warning("Could not navigate. Please click 'Case Report' in the sidebar.")
+
+
 def _show_locked_results_page(case_id: str, status: dict):
     """Show locked state when generation is not complete"""
     st.markdown("<div style='height:.75rem'></div>", unsafe_allow_html=True)
@@ -155,40 +129,6 @@ def _show_locked_results_page(case_id: str, status: dict):
         </div>
     """, unsafe_allow_html=True)
     
-    def _robust_switch_to_case_report():
-        try:
-            from streamlit_extras.switch_page_button import switch_page
-            for target in (
-                "pages/01_Case_Report",
-                "01_Case_Report",
-                "Case Report",
-                "Case_Report",
-                "case report",
-            ):
-                try:
-                    switch_page(target)
-                    return True
-                except Exception:
-                    continue
-        except Exception:
-            pass
-        # Fallback: client-side redirect to root; main page should provide clear nav
-        components.html(
-            """
-            <script>
-              try {
-                if (window && window.parent) {
-                  window.parent.location.replace(window.parent.location.origin + window.parent.location.pathname);
-                } else {
-                  window.location.replace('/');
-                }
-              } catch (e) {}
-            </script>
-            """,
-            height=0,
-        )
-        return False
-
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
         if st.button("🔄 Go to Generating Report", type="primary", use_container_width=True):
@@ -209,24 +149,14 @@ def main() -> None:
     
     # Initialize backend pinger to keep backend alive
     backend = _get_backend_base()
-    if not st.session_state.get("pinger_started", False):
-        try:
-            _start_backend_pinger(backend)
-            st.session_state["pinger_started"] = True
-            st.session_state["pinger_start_time"] = datetime.now()
-        except Exception as e:
-            st.warning(f"⚠️ Could not start backend pinger: {e}")
+    try:
+        start_backend_pinger(backend)
+    except Exception as e:
+        st.warning(f"⚠️ Could not start backend pinger: {e}")
     
     # Authentication removed - no login required
     # Prefer explicit query param ?case= over session to survive refreshes or long runs
-    try:
-        params = st.query_params if hasattr(st, "query_params") else None
-        qp_case = None
-        if params:
-            val = params.get("case")
-            qp_case = (val[0] if isinstance(val, list) else val)
-    except Exception:
-        qp_case = None
+    qp_case = st.query_params.get("case")
 
     # ✅ Unified Case ID retrieval
     case_id = (
@@ -260,11 +190,7 @@ def main() -> None:
         """, unsafe_allow_html=True)
     
         if st.button("📋 Go to Case Report Page", type="primary", use_container_width=True):
-            from streamlit_extras.switch_page_button import switch_page
-            try:
-                switch_page("Case Report")
-            except Exception:
-                st.warning("Could not navigate. Please click 'Case Report' in the sidebar.")
+            _robust_switch_to_case_report()
         st.stop()
     
     elif st.session_state.get("generation_in_progress", False) and not st.session_state.get("generation_complete", False):
@@ -281,11 +207,7 @@ def main() -> None:
         st.info(f"Progress: {progress}% complete")
     
         if st.button("📋 Go to Case Report Page", type="secondary", use_container_width=True):
-            from streamlit_extras.switch_page_button import switch_page
-            try:
-                switch_page("Case Report")
-            except Exception:
-                st.warning("Could not navigate. Please click 'Case Report' in the sidebar.")
+            _robust_switch_to_case_report()
         st.stop()
     
     elif st.session_state.get("generation_complete", False):
@@ -296,19 +218,13 @@ def main() -> None:
     # Show success message when results are unlocked
     st.success("🎉 Report generation complete! Results are now available.")
 
-    try:
-        import requests
-    except Exception:
-        st.error("Requests not available.")
-        return
-
     # Fetch outputs and assets for this case
     with st.spinner("Loading case data…"):
         try:
-            r = requests.get(f"{backend}/s3/{effective_case_id}/outputs", timeout=20)
+            r = _SESSION.get(f"{backend}/s3/{effective_case_id}/outputs", timeout=20)
             outputs = (r.json() or {}).get("items", []) if r.ok else []
             # Also fetch latest assets to get Ground Truth last modified
-            r_assets = requests.get(f"{backend}/s3/{effective_case_id}/latest/assets", timeout=10)
+            r_assets = _SESSION.get(f"{backend}/s3/{effective_case_id}/latest/assets", timeout=10)
             assets = r_assets.json() if r_assets.ok else {}
         except Exception:
             outputs = []
@@ -524,12 +440,11 @@ def main() -> None:
     @st.cache_data(ttl=300)
     def _fetch_code_version_for_case(case_id: str) -> str:
         try:
-            import requests as _rq
             import json as _json, base64 as _b64, os as _os
             
             # 1) Try stored version from backend
             try:
-                backend_r = _rq.get(f"{backend}/reports/{case_id}/code-version", timeout=5)
+                backend_r = _SESSION.get(f"{backend}/reports/{case_id}/code-version", timeout=5)
                 if backend_r.ok:
                     backend_data = backend_r.json() or {}
                     stored_version = backend_data.get("code_version")
@@ -555,7 +470,7 @@ def main() -> None:
             if github_token:
                 headers["Authorization"] = f"token {github_token}"
 
-            r = _rq.get(url, headers=headers, timeout=10)
+            r = _SESSION.get(url, headers=headers, timeout=10)
             if r.ok:
                 data = r.json() or {}
                 content = data.get("content")
@@ -570,7 +485,7 @@ def main() -> None:
                         code_ver = "—"
                     # Store back to backend for future reads
                     try:
-                        _rq.post(f"{backend}/reports/{case_id}/code-version", json={"code_version": code_ver}, timeout=5)
+                        _SESSION.post(f"{backend}/reports/{case_id}/code-version", json={"code_version": code_ver}, timeout=5)
                     except Exception:
                         pass
                     return code_ver
@@ -588,8 +503,7 @@ def main() -> None:
     @st.cache_data(ttl=120)
     def _get_metrics_for_version(backend: str, case_id: str, version: str) -> dict | None:
         try:
-            import requests
-            r = requests.get(f"{backend}/s3/{case_id}/metrics", params={"version": version}, timeout=8)
+            r = _SESSION.get(f"{backend}/s3/{case_id}/metrics", params={"version": version}, timeout=8)
             if r.ok:
                 data = r.json() or {}
                 if data.get("ok"):
@@ -602,9 +516,8 @@ def main() -> None:
     @st.cache_data(show_spinner=False, ttl=60)
     def _get_case_comments(backend: str, case_id: str, ai_label: str = None) -> list[dict]:
         try:
-            import requests as _rq
             params = {"ai_label": ai_label} if ai_label else None
-            r = _rq.get(f"{backend}/comments/{case_id}", params=params, timeout=8)
+            r = _SESSION.get(f"{backend}/comments/{case_id}", params=params, timeout=8)
             if r.ok:
                 return r.json() or []
         except Exception:
@@ -667,7 +580,7 @@ def main() -> None:
         gt_effective_pdf_url = gt_pdf
     elif gt_generic:
         try:
-            r2 = requests.get(f"{backend}/s3/ensure-pdf", params={"url": gt_generic}, timeout=10)
+            r2 = _SESSION.get(f"{backend}/s3/ensure-pdf", params={"url": gt_generic}, timeout=10)
             if r2.ok:
                 d2 = r2.json() or {}
                 url2 = d2.get("url")
@@ -686,7 +599,7 @@ def main() -> None:
     def _render_pdf_base64(proxy_url: str, height_px: int) -> None:
         try:
             import base64 as _b64
-            r = requests.get(proxy_url, timeout=45)
+            r = _SESSION.get(proxy_url, timeout=45)
             if r.ok and r.content:
                 data_uri = _b64.b64encode(r.content).decode("utf-8")
                 st.markdown(
@@ -1074,8 +987,7 @@ def main() -> None:
             if chosen_url:
                 # Convert to PDF via backend and render inline; also offer Office viewer fallback
                 try:
-                    import requests as _rq
-                    ensure = _rq.get(f"{backend}/s3/ensure-pdf", params={"url": chosen_url}, timeout=30)
+                    ensure = _SESSION.get(f"{backend}/s3/ensure-pdf", params={"url": chosen_url}, timeout=30)
                     if ensure.ok:
                         d = ensure.json() or {}
                         pdf_url = d.get("url") or chosen_url
@@ -1110,7 +1022,6 @@ def main() -> None:
 
                 def _try_presign_and_upload(_backend: str, _case_id: str, _fname: str, _bytes: bytes) -> tuple[bool, str | None]:
                     try:
-                        import requests as _rq
                         headers = {"ngrok-skip-browser-warning": "true", "Content-Type": "application/json"}
                         candidates = [
                             ("POST", f"{_backend}/s3/presign"),
@@ -1119,7 +1030,7 @@ def main() -> None:
                         for method, url in candidates:
                             try:
                                 body = {"case_id": _case_id, "type": "ai", "filename": _fname}
-                                r = _rq.post(url, json=body, headers=headers, timeout=15)
+                                r = _SESSION.post(url, json=body, headers=headers, timeout=15)
                                 if r.ok:
                                     data = r.json() or {}
                                     if data.get("url") or data.get("post"):
@@ -1130,7 +1041,7 @@ def main() -> None:
                         if not presigned:
                             try:
                                 files = {"file": (_fname, _bytes, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
-                                r2 = _rq.post(f"{_backend}/upload/ai", files=files, data={"case_id": _case_id, "filename": _fname}, timeout=30, headers={"ngrok-skip-browser-warning": "true"})
+                                r2 = _SESSION.post(f"{_backend}/upload/ai", files=files, data={"case_id": _case_id, "filename": _fname}, timeout=30, headers={"ngrok-skip-browser-warning": "true"})
                                 if r2.ok:
                                     return True, (r2.json() or {}).get("key") or None
                             except Exception:
@@ -1141,12 +1052,12 @@ def main() -> None:
                         if method == "POST" and isinstance(presigned.get("fields"), dict):
                             form = presigned["fields"]
                             files = {"file": (_fname, _bytes, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
-                            r3 = _rq.post(url, data=form, files=files, timeout=60)
+                            r3 = _SESSION.post(url, data=form, files=files, timeout=60)
                             return (r3.ok, presigned.get("key"))
                         else:
-                            r3 = _rq.put(url, data=_bytes, timeout=60)
+                            r3 = _SESSION.put(url, data=_bytes, timeout=60)
                             if not r3.ok:
-                                r3 = _rq.put(url, data=_bytes, headers={"Content-Type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}, timeout=60)
+                                r3 = _SESSION.put(url, data=_bytes, headers={"Content-Type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}, timeout=60)
                             return (r3.ok, presigned.get("key"))
                     except Exception as _e:
                         return False, None
@@ -1179,7 +1090,6 @@ def main() -> None:
         if st.button("Add comment", type="primary", key="comments_form_submit_results"):
             if form_text.strip():
                 try:
-                    import requests as _rq
                     payload = {
                         "case_id": case_id,
                         "ai_label": None,
@@ -1189,7 +1099,7 @@ def main() -> None:
                         "severity": form_severity,
                         "comment": form_text.strip(),
                     }
-                    _rq.post(f"{backend}/comments", json=payload, timeout=8)
+                    _SESSION.post(f"{backend}/comments", json=payload, timeout=8)
                     st.success("Added.")
                 except Exception:
                     st.warning("Failed to add comment.")
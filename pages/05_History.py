@@ -4,55 +4,20 @@ import streamlit.components.v1 as components
 from urllib.parse import quote
 from app.ui import inject_base_styles, theme_provider, top_nav
 from app.auth import require_authentication, get_current_user, logout
-import time
+from app.pinger import start_backend_pinger
+from app.http_client import get_session
 import requests
-import threading
-import random
-from datetime import datetime
 
 # Require authentication for this page
 require_authentication()
 
-
-def _ping_backend(backend_url: str) -> bool:
-    """Ping the backend to keep it alive."""
-    try:
-        response = requests.get(f"{backend_url}/health", timeout=5)
-        return response.ok
-    except Exception:
-        return False
-
-
-def _start_backend_pinger(backend_url: str):
-    """Start background thread to ping backend every 5-7 minutes."""
-    def pinger():
-        while True:
-            try:
-                # Random interval between 5-7 minutes (300-420 seconds)
-                interval = random.randint(300, 420)
-                time.sleep(interval)
-                
-                # Ping the backend
-                success = _ping_backend(backend_url)
-                if success:
-                    print(f"✅ Backend ping successful at {datetime.now()}")
-                else:
-                    print(f"❌ Backend ping failed at {datetime.now()}")
-                    
-            except Exception as e:
-                print(f"❌ Pinger error: {e}")
-                time.sleep(60)  # Wait 1 minute before retrying
-    
-    # Start the pinger thread
-    thread = threading.Thread(target=pinger, daemon=True)
-    thread.start()
-    return thread
+# Shared keep-alive session; lives in an imported module so it survives reruns
+_SESSION = get_session()
 
 
 def _get_backend_base() -> str:
-    params = st.query_params if hasattr(st, "query_params") else {}
     return (
-        (params.get("api", [None])[0] if isinstance(params.get("api"), list) else params.get("api"))
+        st.query_params.get("api")
         or os.getenv("BACKEND_BASE")
         or "http://localhost:8000"
     ).rstrip("/")
@@ -102,7 +67,6 @@ def _extract_patient_from_strings(case_id: str, *, gt_key: str | None = None, ai
 def _case_to_patient_map(backend: str, cases: list[str]) -> dict[str, str]:
     """Build a mapping of case_id -> patient name (only from Ground Truth)."""
     try:
-        import requests
         import urllib.parse
         from concurrent.futures import ThreadPoolExecutor, as_completed
     except Exception:
@@ -111,7 +75,7 @@ def _case_to_patient_map(backend: str, cases: list[str]) -> dict[str, str]:
     def _fetch_patient_for_case(cid: str) -> tuple[str, str | None]:
         """Fetch patient name for a single case."""
         try:
-            r2 = requests.get(f"{backend}/s3/{cid}/latest/assets", timeout=4)
+            r2 = _SESSION.get(f"{backend}/s3/{cid}/latest/assets", timeout=4)
             if r2.ok:
                 assets = r2.json() or {}
                 # Prefer explicit S3 key if provided
@@ -147,8 +111,7 @@ def _case_to_patient_map(backend: str, cases: list[str]) -> dict[str, str]:
 def _check_backend_connection(backend: str) -> dict:
     """Check if backend is accessible."""
     try:
-        import requests
-        r = requests.get(f"{backend}/health", timeout=5)
+        r = _SESSION.get(f"{backend}/health", timeout=5)
         if r.ok:
             return {"connected": True, "error": None}
         else:
@@ -164,8 +127,7 @@ def _check_backend_connection(backend: str) -> dict:
 def _get_all_cases(backend: str) -> list[str]:
     """Fetch all case IDs from S3 with caching."""
     try:
-        import requests
-        r = requests.get(f"{backend}/s3/cases", timeout=10)
+        r = _SESSION.get(f"{backend}/s3/cases", timeout=10)
         if r.ok:
             data = r.json() or {}
             return data.get("cases", []) or []
@@ -177,8 +139,7 @@ def _get_all_cases(backend: str) -> list[str]:
 def _get_case_outputs(backend: str, case_id: str) -> list[dict]:
     """Fetch outputs for a specific case (live, not cached)."""
     try:
-        import requests
-        r = requests.get(f"{backend}/s3/{case_id}/outputs", timeout=20)
+        r = _SESSION.get(f"{backend}/s3/{case_id}/outputs", timeout=20)
         if r.ok:
             data = r.json() or {}
             return data.get("items", []) or []
@@ -191,8 +152,7 @@ def _get_case_outputs(backend: str, case_id: str) -> list[dict]:
 def _get_case_assets(backend: str, case_id: str) -> dict:
     """Fetch assets for a specific case with caching."""
     try:
-        import requests
-        r = requests.get(f"{backend}/s3/{case_id}/latest/assets", timeout=10)
+        r = _SESSION.get(f"{backend}/s3/{case_id}/latest/assets", timeout=10)
         if r.ok:
             return r.json() or {}
     except Exception:
@@ -204,9 +164,8 @@ def _get_case_assets(backend: str, case_id: str) -> dict:
 def _get_case_comments(backend: str, case_id: str, ai_label: str = None) -> list[dict]:
     """Fetch comments for a specific case with caching."""
     try:
-        import requests
         params = {"ai_label": ai_label} if ai_label else None
-        r = requests.get(f"{backend}/comments/{case_id}", params=params, timeout=8)
+        r = _SESSION.get(f"{backend}/comments/{case_id}", params=params, timeout=8)
         if r.ok:
             return r.json() or []
     except Exception:
@@ -217,8 +176,7 @@ def _get_case_comments(backend: str, case_id: str, ai_label: str = None) -> list
 @st.cache_data(show_spinner=False, ttl=120)
 def _get_metrics_for_version(backend: str, case_id: str, version: str) -> dict | None:
     try:
-        import requests
-        r = requests.get(f"{backend}/s3/{case_id}/metrics", params={"version": version}, timeout=8)
+        r = _SESSION.get(f"{backend}/s3/{case_id}/metrics", params={"version": version}, timeout=8)
         if r.ok:
             data = r.json() or {}
             if data.get("ok"):
@@ -299,20 +257,16 @@ def main() -> None:
     
     # Initialize backend pinger to keep backend alive
     backend = _get_backend_base()
-    if not st.session_state.get("pinger_started", False):
-        try:
-            _start_backend_pinger(backend)
-            st.session_state["pinger_started"] = True
-            from datetime import datetime as _dt
-            st.session_state["pinger_start_time"] = _dt.now()
-        except Exception as e:
-            st.warning(f"⚠️ Could not start backend pinger: {e}")
+    try:
+        start_backend_pinger(backend)
+    except Exception as e:
+        st.warning(f"⚠️ Could not start backend pinger: {e}")
 
     # Helper: inline PDF via base64 (reliable on Streamlit Cloud)
     def _render_pdf_base64(proxy_url: str, height_px: int) -> None:
         try:
-            import requests as _rq, base64 as _b64
-            r = _rq.get(proxy_url, timeout=45)
+            import base64 as _b64
+            r = _SESSION.get(proxy_url, timeout=45)
             if r.ok and r.content:
                 data_uri = _b64.b64encode(r.content).decode("utf-8")
                 st.markdown(
@@ -354,12 +308,6 @@ def main() -> None:
     # Nav bar
     top_nav(active="History")
 
-    try:
-        import requests
-    except Exception:
-        st.error("Requests not available.")
-        return
-
     backend = _get_backend_base()
 
     st.markdown("## History: Browse All Cases")
@@ -502,9 +450,8 @@ def main() -> None:
     # Augment from DB when no S3 outputs exist (helps for mock cases like 9999)
     if not outputs_all:
         try:
-            import requests as _rq
             backend_url = _get_backend_base()
-            r = _rq.get(f"{backend_url}/runs/{case_id}", timeout=5)
+            r = _SESSION.get(f"{backend_url}/runs/{case_id}", timeout=5)
             if r.ok:
                 p = r.json() or {}
                 run = (p.get("run") if isinstance(p, dict) else None) or {}
@@ -689,13 +636,12 @@ def main() -> None:
     @st.cache_data(ttl=300)
     def _fetch_code_version_for_case(case_id: str) -> str:
         try:
-            import requests as _rq
             import json as _json, base64 as _b64, os as _os
             backend_url = _get_backend_base()
             
             # 1) Try stored version from backend
             try:
-                backend_r = _rq.get(f"{backend_url}/reports/{case_id}/code-version", timeout=5)
+                backend_r = _SESSION.get(f"{backend_url}/reports/{case_id}/code-version", timeout=5)
                 if backend_r.ok:
                     backend_data = backend_r.json() or {}
                     stored_version = backend_data.get("code_version")
@@ -719,7 +665,7 @@ def main() -> None:
             headers = {"Accept": "application/vnd.github.v3+json"}
             if github_token:
                 headers["Authorization"] = f"token {github_token}"
-            r = _rq.get(url, headers=headers, timeout=10)
+            r = _SESSION.get(url, headers=headers, timeout=10)
             if r.ok:
                 data = r.json() or {}
                 content = data.get("content")
@@ -734,7 +680,7 @@ def main() -> None:
                         code_ver = "—"
                     # Store back to backend for future reads
                     try:
-                        _rq.post(f"{backend_url}/reports/{case_id}/code-version", json={"code_version": code_ver}, timeout=5)
+                        _SESSION.post(f"{backend_url}/reports/{case_id}/code-version", json={"code_version": code_ver}, timeout=5)
                     except Exception:
                         pass
                     return code_ver
@@ -757,8 +703,7 @@ def main() -> None:
             raw_key = assets.get("ground_truth_key") if isinstance(assets, dict) else None
             params = {"key": raw_key} if raw_key else {"url": gt_generic}
             try:
-                import requests as _rq
-                r2 = _rq.get(f"{backend}/s3/ensure-pdf", params=params, timeout=10)
+                r2 = _SESSION.get(f"{backend}/s3/ensure-pdf", params=params, timeout=10)
                 if r2.ok:
                     d2 = r2.json() or {}
                     url2 = d2.get("url")
@@ -1090,7 +1035,7 @@ def main() -> None:
             raw_key = assets.get("ground_truth_key") if isinstance(assets, dict) else None
             params = {"key": raw_key} if raw_key else {"url": gt_generic}
             try:
-                r2 = requests.get(f"{backend}/s3/ensure-pdf", params=params, timeout=10)
+                r2 = _SESSION.get(f"{backend}/s3/ensure-pdf", params=params, timeout=10)
                 if r2.ok:
                     d2 = r2.json() or {}
                     url2 = d2.get("url")
@@ -1431,13 +1376,12 @@ def main() -> None:
                 # High‑fidelity Preview (Playwright — default)
                 st.markdown("### High‑fidelity Preview (Playwright — default)")
                 try:
-                    import requests as _rq
                     headers = {"ngrok-skip-browser-warning": "true", "Content-Type": "application/json"}
                     cache_key = f"pw_pdf_{case_id}_{(sel_ver or '').strip()}"
                     if cache_key not in st.session_state:
                         with st.spinner("Rendering DOCX via Playwright…"):
                             body = {"url": chosen_url, "case_id": case_id, "filename": f"{case_id}_{(sel_ver or 'docx').replace(' ', '_')}.pdf"}
-                            r = _rq.post(f"{backend}/render/docx-to-pdf", json=body, headers=headers, timeout=180)
+                            r = _SESSION.post(f"{backend}/render/docx-to-pdf", json=body, headers=headers, timeout=180)
                             if r.ok:
                                 data = r.json() or {}
                                 st.session_state[cache_key] = data.get("url")
@@ -1463,10 +1407,9 @@ def main() -> None:
                 with col1:
                     if st.button("📥 Download Original DOCX", key=f"hist_download_{case_id}", type="primary"):
                         try:
-                            import requests
                             # Use backend proxy to avoid CORS issues
                             proxy_url = f"{backend}/proxy/docx?url={quote(chosen_url, safe='')}"
-                            response = requests.get(proxy_url, timeout=45)
+                            response = _SESSION.get(proxy_url, timeout=45)
                             if response.status_code == 200 and response.content:
                                 st.download_button(
                                     "⬇️ Download Original",
@@ -1478,7 +1421,7 @@ def main() -> None:
                                 st.success("Original DOCX file ready for download!")
                             else:
                                 # Fallback: try downloading directly from the DOCX URL
-                                direct = requests.get(chosen_url, timeout=45)
+                                direct = _SESSION.get(chosen_url, timeout=45)
                                 if direct.ok and direct.content:
                                     st.download_button(
                                         "⬇️ Download Original",
@@ -1511,7 +1454,6 @@ def main() -> None:
 
                 def _try_presign_and_upload(_backend: str, _case_id: str, _fname: str, _bytes: bytes) -> tuple[bool, str | None]:
                     try:
-                        import requests as _rq
                         headers = {"ngrok-skip-browser-warning": "true", "Content-Type": "application/json"}
                         # Try a few common endpoints for presign
                         candidates = [
@@ -1522,7 +1464,7 @@ def main() -> None:
                         for method, url in candidates:
                             try:
                                 body = {"case_id": _case_id, "type": "ai", "filename": _fname}
-                                r = _rq.post(url, json=body, headers=headers, timeout=15)
+                                r = _SESSION.post(url, json=body, headers=headers, timeout=15)
                                 if r.ok:
                                     data = r.json() or {}
                                     if data.get("url"):
@@ -1534,7 +1476,7 @@ def main() -> None:
                             # Fallback: direct upload endpoint (multipart)
                             try:
                                 files = {"file": (_fname, _bytes, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
-                                r2 = _rq.post(f"{_backend}/upload/ai", files=files, data={"case_id": _case_id, "filename": _fname}, timeout=30, headers={"ngrok-skip-browser-warning": "true"})
+                                r2 = _SESSION.post(f"{_backend}/upload/ai", files=files, data={"case_id": _case_id, "filename": _fname}, timeout=30, headers={"ngrok-skip-browser-warning": "true"})
                                 if r2.ok:
                                     return True, (r2.json() or {}).get("key") or None
                             except Exception:
@@ -1546,15 +1488,15 @@ def main() -> None:
                         if method == "POST" and isinstance(presigned.get("fields"), dict):
                             form = presigned["fields"]
                             files = {"file": (_fname, _bytes, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
-                            r3 = _rq.post(url, data=form, files=files, timeout=60)
+                            r3 = _SESSION.post(url, data=form, files=files, timeout=60)
                             return (r3.ok, presigned.get("key"))
                         else:
                             # Default to PUT
                             # Note: some presigned URLs fail if Content-Type is set; try without first
-                            r3 = _rq.put(url, data=_bytes, timeout=60)
+                            r3 = _SESSION.put(url, data=_bytes, timeout=60)
                             if not r3.ok:
                                 # Retry with content-type header
-                                r3 = _rq.put(url, data=_bytes, headers={"Content-Type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}, timeout=60)
+                                r3 = _SESSION.put(url, data=_bytes, headers={"Content-Type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}, timeout=60)
                             return (r3.ok, presigned.get("key"))
                     except Exception as _e:
                         return False, None
@@ -1733,7 +1675,6 @@ def main() -> None:
             if st.button("Add comment", type="primary", key="comments_form_submit"):
                 if form_text.strip():
                     try:
-                        import requests as _rq
                         backend = st.session_state.get("backend_url", "http://localhost:8000")
                         if form_section.startswith("    └─ "):
                             subsection = form_section.replace("    └─ ", "")
@@ -1750,7 +1691,7 @@ def main() -> None:
                             "severity": form_severity,
                             "comment": form_text.strip(),
                         }
-                        _rq.post(f"{backend}/comments", json=payload, timeout=8)
+                        _SESSION.post(f"{backend}/comments", json=payload, timeout=8)
                         _get_case_comments.clear()
                         st.success("Added.")
                     except Exception:
@@ -1824,8 +1765,7 @@ def main() -> None:
                     label = ("✓ Resolve" if not is_resolved else "✗ Unresolve")
                     if st.button(label, key=f"row_resolve_{nid}") and nid:
                         try:
-                            import requests as _rq
-                            _rq.patch(f"{backend}/comments/resolve", json={"id": int(nid), "case_id": case_id, "resolved": (not is_resolved)}, timeout=8, headers={"ngrok-skip-browser-warning": "true"})
+                            _SESSION.patch(f"{backend}/comments/resolve", json={"id": int(nid), "case_id": case_id, "resolved": (not is_resolved)}, timeout=8, headers={"ngrok-skip-browser-warning": "true"})
                             _get_case_comments.clear()
                         except Exception:
                             pass
@@ -1833,8 +1773,7 @@ def main() -> None:
                 with act2:
                     if st.button("🗑️", key=f"row_delete_{nid}") and nid:
                         try:
-                            import requests as _rq
-                            _rq.delete(f"{backend}/comments", json={"case_id": case_id, "ai_label": selected_label, "ids": [int(nid)]}, timeout=8, headers={"ngrok-skip-browser-warning": "true"})
+                            _SESSION.delete(f"{backend}/comments", json={"case_id": case_id, "ai_label": selected_label, "ids": [int(nid)]}, timeout=8, headers={"ngrok-skip-browser-warning": "true"})
                             _get_case_comments.clear()
                         except Exception:
                             pass
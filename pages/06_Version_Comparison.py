@@ -7,15 +7,18 @@ Compare different versions of LCP documents for a case.
 import streamlit as st
 import os
 from datetime import datetime
-import requests
 from app.ui import inject_base_styles, theme_provider, top_nav
 from app.auth import require_authentication, get_current_user
+from app.http_client import get_session
 from app.s3_utils import get_s3_manager
 from app.version_comparison import LCPVersionComparator
 
 # Require authentication
 require_authentication()
 
+# Shared keep-alive session; lives in an imported module so it survives reruns
+_SESSION = get_session()
+
 
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human-readable format."""
@@ -70,7 +73,7 @@ def main():
     def fetch_available_cases_cached() -> list[str]:
         backend = (os.getenv("BACKEND_BASE") or "http://localhost:8000").rstrip("/")
         try:
-            res = requests.get(f"{backend}/s3/cases", timeout=6)
+            res = _SESSION.get(f"{backend}/s3/cases", timeout=6)
             if res.ok:
                 data = res.json() or {}
                 cases = data.get("cases", []) or []